@@ -0,0 +1,243 @@
+import json
+import logging
+import re
+import threading
+import time
+
+from Tool.mcp_client import mcp_session, format_tool_result
+from Tool.tool_wrapper import runner
+
+logger = logging.getLogger(__name__)
+
+
+# ── Intent templates ───────────────────────
+# Only whole-message imperative commands match; anything else goes to the agent.
+TORQUE = r"(?P<torque>\d+(?:\.\d+)?)\s*(?:n\s*[·.\-]?\s*m|뉴턴\s*미터)"
+MAKE_AFPM_TEMPLATES = [
+    # "make an AFPM motor with 5 Nm torque", "please produce an afpm with a torque of 5 nm"
+    re.compile(
+        r"^(?:please\s+)?(?:make|produce|manufacture|build)\s+(?:an?\s+)?afpm(?:\s+motor)?"
+        r"\s+(?:with|at|of)\s+(?:a\s+)?(?:torque\s+(?:of\s+)?)?" + TORQUE +
+        r"(?:\s+(?:of\s+)?torque)?(?:\s+please)?$"
+    ),
+    # "AFPM 5Nm 생산해줘", "AFPM 모터 토크 5Nm로 만들어 주세요"
+    re.compile(
+        r"^afpm\s*(?:모터\s*)?(?:토크\s*)?" + TORQUE +
+        r"\s*(?:토크\s*)?(?:로\s*)?(?:만들어|생산해|제작해)\s*(?:줘|주세요)$"
+    ),
+    # "5Nm AFPM 모터를 만들어줘", "5Nm 토크의 AFPM을 생산해 주세요"
+    re.compile(
+        r"^" + TORQUE + r"\s*(?:토크\s*)?(?:의\s*)?afpm\s*(?:모터\s*)?(?:을|를)?"
+        r"\s*(?:만들어|생산해|제작해)\s*(?:줘|주세요)$"
+    ),
+]
+# Rejected before any template is tried, in case a template is ever loosened.
+NEGATION_PATTERN = re.compile(r"\b(?:not|don'?t|never|no)\b|하지\s*마|말아|않", re.IGNORECASE)
+QUESTION_PATTERN = re.compile(
+    r"\?|^(?:how|what|which|why|when|can|could|would|should|is|are|do|does)\b|몇|까$", re.IGNORECASE)
+
+
+def normalize_command(text: str) -> str:
+    return re.sub(r"\s+", " ", text.strip().lower()).rstrip(".! ")
+
+
+def match_make_afpm(text: str):
+    """'make an AFPM motor with 5 Nm torque' -> {"torque": 5}"""
+    command = normalize_command(text)
+    if NEGATION_PATTERN.search(command) or QUESTION_PATTERN.search(command):
+        return None
+    for template in MAKE_AFPM_TEMPLATES:
+        match = template.match(command)
+        if match is not None:
+            torque = float(match.group("torque"))
+            if torque <= 0:
+                return None
+            return {"torque": int(torque) if torque.is_integer() else torque}
+    return None
+
+
+class FastPathStepError(Exception):
+    """A step of a chain reported an error; later steps were not run."""
+
+    def __init__(self, message, steps):
+        super().__init__(message)
+        self.steps = steps
+
+
+FAILED_STATUSES = ("error", "failed", "failure")
+
+
+def check_step_result(tool: str, text: str):
+    """Parsed tool result. Raises ValueError on an "error" key, a failed status or an unparseable payload."""
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        raise ValueError(f"{tool} returned an unexpected result: {text}")
+    if isinstance(payload, dict):
+        if "error" in payload:
+            raise ValueError(f"{tool} failed: {payload['error']}")
+        if str(payload.get("status", "")).lower() in FAILED_STATUSES:
+            raise ValueError(f"{tool} failed: {payload}")
+    return payload
+
+
+async def run_make_afpm(slots: dict) -> list:
+    steps = []
+
+    async def step(tool, arguments):
+        started = time.perf_counter()
+        text = format_tool_result(await mcp_session.call_tool(tool, arguments))
+        steps.append({"tool": tool, "arguments": arguments, "result": text,
+                      "seconds": round(time.perf_counter() - started, 3)})
+        try:
+            return check_step_result(tool, text)
+        except ValueError as e:
+            raise FastPathStepError(str(e), steps)
+
+    turns = await step("calculate_required_turns_make_afpm", {"value": slots["torque"]})
+    if not isinstance(turns, int) or turns <= 0:
+        raise FastPathStepError(f"Turn calculation failed: {turns}", steps)
+    result = await step("set_coil_turn", {"value": turns})
+    if not isinstance(result, dict) or "status" not in result:
+        raise FastPathStepError(f"set_coil_turn did not confirm the write: {result}", steps)
+    result = await step("start_manufacturing", {"value": 1})
+    if not isinstance(result, dict) or result.get("status") != "Start Manufacturing Successfully":
+        raise FastPathStepError(f"start_manufacturing did not start production: {result}", steps)
+    return steps
+
+
+def describe_make_afpm(slots: dict) -> str:
+    return (f"Make an AFPM motor with {slots['torque']} Nm torque: calculate the coil turns, "
+            f"write them to the PLC (set_coil_turn) and start production (start_manufacturing).")
+
+
+class Recipe:
+    def __init__(self, name, matcher, chain, describe, writes_plc):
+        self.name = name
+        self.matcher = matcher
+        self.chain = chain
+        self.describe = describe
+        self.writes_plc = writes_plc
+
+
+RECIPES = [
+    Recipe("make_afpm", match_make_afpm, run_make_afpm, describe_make_afpm, writes_plc=True),
+]
+
+
+class FastPathPlan:
+    """A matched recipe waiting to run. Recipes that write to the PLC need confirmation first."""
+
+    def __init__(self, recipe: Recipe, slots: dict):
+        self.recipe = recipe
+        self.slots = slots
+
+    @property
+    def needs_confirmation(self) -> bool:
+        return self.recipe.writes_plc
+
+    def describe(self) -> str:
+        return self.recipe.describe(self.slots)
+
+
+class FastPathMetrics:
+    """Hit rate of the fast path and the agent latency it saved."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self.cancelled = 0
+        self.fast_path_seconds = 0.0
+        self.agent_seconds = 0.0
+        self.agent_runs = 0
+
+    def record_hit(self, seconds):
+        with self._lock:
+            self.hits += 1
+            self.fast_path_seconds += seconds
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    def record_cancel(self):
+        with self._lock:
+            self.cancelled += 1
+
+    def record_agent(self, seconds):
+        with self._lock:
+            self.agent_runs += 1
+            self.agent_seconds += seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses + self.failures + self.cancelled
+            avg_agent = self.agent_seconds / self.agent_runs if self.agent_runs else None
+            avg_fast = self.fast_path_seconds / self.hits if self.hits else None
+            saved = (avg_agent - avg_fast) * self.hits if avg_agent is not None and avg_fast is not None else None
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "failures": self.failures,
+                "cancelled": self.cancelled,
+                "hit_rate": round(self.hits / total, 3) if total else None,
+                "avg_fast_path_seconds": round(avg_fast, 3) if avg_fast is not None else None,
+                "avg_agent_seconds": round(avg_agent, 3) if avg_agent is not None else None,
+                "estimated_seconds_saved": round(saved, 1) if saved is not None else None,
+            }
+
+
+metrics = FastPathMetrics()
+
+
+def format_steps(recipe: str, steps: list) -> str:
+    lines = [f"⚡ Executed `{recipe}` without the LLM:"]
+    for number, step in enumerate(steps, start=1):
+        lines.append(f"Step {number}: `{step['tool']}` {step['arguments']} → {step['result']} ({step['seconds']}s)")
+    return "\n\n".join(lines)
+
+
+def match_fast_path(text: str):
+    """The plan of the first recipe whose template matches the whole message, or None (use the agent)."""
+    for recipe in RECIPES:
+        slots = recipe.matcher(text)
+        if slots is not None:
+            logger.info(f"[fast_path] Matched {recipe.name} with {slots}")
+            return FastPathPlan(recipe, slots)
+    metrics.record_miss()
+    return None
+
+
+def cancel_plan(plan: FastPathPlan) -> str:
+    metrics.record_cancel()
+    return f"🚫 `{plan.recipe.name}` cancelled, nothing was written to the PLC."
+
+
+def execute_plan(plan: FastPathPlan) -> str:
+    """
+    Run a (confirmed) plan and return the answer text.
+
+    The chain stops at the first step that reports an error. Failures are
+    reported instead of falling back to the agent, because earlier steps may
+    already have written to the PLC.
+    """
+    name = plan.recipe.name
+    started = time.perf_counter()
+    try:
+        steps = runner.run(plan.recipe.chain(plan.slots))
+    except FastPathStepError as e:
+        metrics.record_failure()
+        logger.error(f"[fast_path] {name} stopped: {e}")
+        return format_steps(name, e.steps) + f"\n\n❌ Stopped: {e}"
+    except Exception as e:
+        metrics.record_failure()
+        logger.error(f"[fast_path] {name} failed: {e}", exc_info=True)
+        return f"❌ `{name}` failed: {e}"
+    metrics.record_hit(time.perf_counter() - started)
+    return format_steps(name, steps)
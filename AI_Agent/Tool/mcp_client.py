@@ -1,24 +1,167 @@
+import asyncio
+import hashlib
 import logging
+import os
 from fastmcp import Client
+from fastmcp.exceptions import ToolError
+from mcp import types
 import json
 
 logger = logging.getLogger(__name__)
 
 
 #Replace with the actual MCP server address.
-MCP_URL = "http://192.168.0.79:9000/mcp"
+MCP_URL = os.getenv("MCP_URL", "http://192.168.0.79:9000/mcp")
+HEARTBEAT_INTERVAL = 30.0  # seconds between pings on an idle session
+
 def get_client():
     logger.debug("Creating MCP client instance.")
     return Client(MCP_URL)
 
+
+class PersistentMCPClient:
+    """
+    One long-lived MCP session shared by all tool calls.
+
+    The session is opened on first use (including the initialize handshake)
+    and kept open by a runner task that also pings the server every
+    heartbeat_interval seconds. If the ping or a call fails on the transport,
+    the session is torn down and re-initialized once before giving up.
+    Tool errors reported by the server are raised as is and do not reconnect.
+
+    list_tools() caches the server's tool catalogue. It is fetched again only
+    after the server sends notifications/tools/list_changed or a new session
+    is opened; catalog_version changes whenever the fetched catalogue differs.
+    """
+
+    def __init__(self, url, heartbeat_interval=HEARTBEAT_INTERVAL):
+        self.url = url
+        self.heartbeat_interval = heartbeat_interval
+        self._client = None
+        self._runner = None
+        self._stop = None
+        self._lock = None
+        self._loop = None
+        self._tools = None
+        self._tools_fingerprint = None
+        self._tools_stale = True
+        self.catalog_version = 0
+
+    def _bind_loop(self):
+        # Sessions and locks belong to the event loop that created them.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._client = None
+            self._runner = None
+            self._lock = asyncio.Lock()
+            self._loop = loop
+
+    async def _run_session(self, ready: asyncio.Future):
+        try:
+            async with Client(self.url, message_handler=self._on_message) as client:
+                logger.info(f"MCP session opened: {self.url}")
+                # The server may have been restarted with a different tool set.
+                self._tools_stale = True
+                self._client = client
+                ready.set_result(client)
+                while True:
+                    try:
+                        await asyncio.wait_for(self._stop.wait(), timeout=self.heartbeat_interval)
+                        break
+                    except asyncio.TimeoutError:
+                        pass
+                    try:
+                        await client.ping()
+                    except Exception as e:
+                        logger.warning(f"MCP heartbeat failed, closing session: {e}")
+                        break
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning(f"MCP session closed with error: {e}")
+        finally:
+            self._client = None
+            logger.info(f"MCP session closed: {self.url}")
+
+    async def _on_message(self, message):
+        if isinstance(message, types.ServerNotification) and \
+                isinstance(message.root, types.ToolListChangedNotification):
+            logger.info("MCP server tool catalogue changed.")
+            self._tools_stale = True
+
+    async def session(self) -> Client:
+        self._bind_loop()
+        async with self._lock:
+            if self._client is None:
+                self._stop = asyncio.Event()
+                ready = asyncio.get_running_loop().create_future()
+                self._runner = asyncio.create_task(self._run_session(ready))
+                await ready
+            return self._client
+
+    async def reset(self):
+        if self._runner is not None and not self._runner.done():
+            self._stop.set()
+            try:
+                await asyncio.wait_for(self._runner, timeout=5)
+            except Exception:
+                self._runner.cancel()
+        self._client = None
+        self._runner = None
+
+    async def call_tool(self, name: str, arguments: dict = None):
+        arguments = arguments or {}
+        try:
+            client = await self.session()
+            return await client.call_tool(name, arguments)
+        except ToolError:
+            raise
+        except Exception as e:
+            logger.warning(f"MCP call '{name}' failed ({e}), re-initializing session")
+            await self.reset()
+            client = await self.session()
+            return await client.call_tool(name, arguments)
+
+    async def list_tools(self, refresh: bool = False) -> list:
+        if refresh or self._tools is None or self._tools_stale:
+            client = await self.session()
+            self._tools_stale = False
+            tools = await client.list_tools()
+            fingerprint = hashlib.sha256(json.dumps(
+                [[t.name, t.description, t.inputSchema] for t in tools], sort_keys=True, default=str,
+            ).encode("utf-8")).hexdigest()
+            if fingerprint != self._tools_fingerprint:
+                self._tools_fingerprint = fingerprint
+                self.catalog_version += 1
+                logger.info(f"Loaded MCP tool catalogue v{self.catalog_version}: {[t.name for t in tools]}")
+            self._tools = tools
+        return self._tools
+
+    async def close(self):
+        await self.reset()
+
+
+def format_tool_result(response) -> str:
+    """Turn an MCP call_tool response into text, pretty-printing JSON payloads."""
+    content = getattr(response, "content", response)
+    text = "\n".join(getattr(item, "text", str(item)) for item in content)
+    try:
+        return json.dumps(json.loads(text), indent=2, ensure_ascii=False)
+    except ValueError:
+        return text
+
+
+# Shared session used by every wrapper below.
+mcp_session = PersistentMCPClient(MCP_URL)
+
 # Start process
 async def start_manufacturing():
     try:
-        async with get_client() as client:
-            logger.info("Calling MCP tool: start_manufacturing")
-            response = await client.call_tool("start_manufacturing", {"value": 1})
-            logger.info(f"Response from start_manufacturing: {response}")
-            return response
+        logger.info("Calling MCP tool: start_manufacturing")
+        response = await mcp_session.call_tool("start_manufacturing", {"value": 1})
+        logger.info(f"Response from start_manufacturing: {response}")
+        return format_tool_result(response)
     except Exception as e:
         logger.error(f"Error in start_manufacturing: {e}", exc_info=True)
         raise
@@ -26,23 +169,21 @@ async def start_manufacturing():
 # Set coil turns.
 async def set_coil_turn(turn: int):
     try:
-        async with get_client() as client:
-            logger.info(f"Calling MCP tool: set_coil_turn with turn={turn}")
-            response = await client.call_tool("set_coil_turn", {"value": turn})
-            logger.info(f"Response from set_coil_turn: {response}")
-            return response
+        logger.info(f"Calling MCP tool: set_coil_turn with turn={turn}")
+        response = await mcp_session.call_tool("set_coil_turn", {"value": turn})
+        logger.info(f"Response from set_coil_turn: {response}")
+        return format_tool_result(response)
     except Exception as e:
         logger.error(f"Error in set_coil_turn: {e}", exc_info=True)
         raise
 
 # Calculate the number of turns based on the target torque.
-async def calculate_required_turns(torque: int):
+async def calculate_required_turns(torque: float):
     try:
-        async with get_client() as client:
-            logger.info(f"Calling MCP tool: calculate_required_turns_make_afpm with torque={torque}")
-            response = await client.call_tool("calculate_required_turns_make_afpm", {"value": torque})
-            logger.info(f"Response from calculate_required_turns_make_afpm: {response}")
-            return response
+        logger.info(f"Calling MCP tool: calculate_required_turns_make_afpm with torque={torque}")
+        response = await mcp_session.call_tool("calculate_required_turns_make_afpm", {"value": torque})
+        logger.info(f"Response from calculate_required_turns_make_afpm: {response}")
+        return format_tool_result(response)
     except Exception as e:
         logger.error(f"Error in calculate_required_turns: {e}", exc_info=True)
         raise
@@ -50,13 +191,10 @@ async def calculate_required_turns(torque: int):
 # Retrieve submodel.
 async def get_submodels(process_name: str):
     try:
-        async with get_client() as client:
-            logger.info(f"Calling MCP tool: get_submodels with process_name='{process_name}'")
-            response = await client.call_tool("get_submodels", {"value": process_name})
-            pretty_response = json.loads(response[0].text)
-            final_result = json.dumps(pretty_response, indent=2, ensure_ascii=False)
-            logger.info(f"Get Submodels Complete ")
-            return final_result
+        logger.info(f"Calling MCP tool: get_submodels with process_name='{process_name}'")
+        response = await mcp_session.call_tool("get_submodels", {"value": process_name})
+        logger.info(f"Get Submodels Complete ")
+        return format_tool_result(response)
     except Exception as e:
         logger.error(f"Error in get_submodels: {e}", exc_info=True)
         raise
@@ -65,13 +203,10 @@ async def get_submodels(process_name: str):
 # Check connectable processes.
 async def check_available_processes():
     try:
-        async with get_client() as client:
-            logger.info("Calling MCP tool: check_available_processes")
-            response = await client.call_tool("check_available_processes", {})
-            pretty_response = json.loads(response[0].text)
-            final_result = json.dumps(pretty_response,indent=2, ensure_ascii=False)
-            logger.info(f"Get Available Process Info Complete ")
-            return final_result
+        logger.info("Calling MCP tool: check_available_processes")
+        response = await mcp_session.call_tool("check_available_processes", {})
+        logger.info(f"Get Available Process Info Complete ")
+        return format_tool_result(response)
     except Exception as e:
         logger.error(f"Error in check_available_processes: {e}", exc_info=True)
-        raise
\ No newline at end of file
+        raise
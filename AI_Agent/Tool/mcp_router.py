@@ -0,0 +1,96 @@
+import asyncio
+import json
+import logging
+import re
+from urllib.parse import urlsplit
+
+from Tool.mcp_client import PersistentMCPClient, format_tool_result, mcp_session
+
+logger = logging.getLogger(__name__)
+
+
+MCP_PATH = "/mcp"
+TOOL_SEPARATOR = "__"  # namespaced tool name: <server>__<tool>
+
+
+def namespace(server: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_]", "_", server)
+
+
+def endpoint(url: str):
+    """(host, port) of an MCP URL, to recognise the same server behind differently written URLs."""
+    parts = urlsplit(url)
+    return (parts.hostname or "").lower(), parts.port or (443 if parts.scheme == "https" else 80)
+
+
+class MCPRouter:
+    """
+    Routes tool calls to the MCP servers of all available equipment.
+
+    Servers are discovered through check_available_processes on the main MCP
+    server. One persistent session is kept per equipment server, tools are
+    exposed as "<server>__<tool>" and calls to different servers run
+    concurrently. The main MCP server itself is skipped, its tools are
+    already in the agent's tool list.
+    """
+
+    def __init__(self, discovery: PersistentMCPClient = mcp_session):
+        self.discovery = discovery
+        self.sessions = {}   # server namespace -> PersistentMCPClient
+        self.routes = {}     # namespaced tool name -> (server namespace, tool name)
+
+    async def discover(self) -> dict:
+        response = await self.discovery.call_tool("check_available_processes", {})
+        result = json.loads(format_tool_result(response))
+        servers = {}
+        for entry in result.get("available", []):
+            url = f"http://{entry['ip']}:{entry['port']}{MCP_PATH}"
+            if endpoint(url) == endpoint(self.discovery.url):
+                continue
+            servers[namespace(entry["aas_name"])] = url
+
+        for name in list(self.sessions):
+            if name not in servers or self.sessions[name].url != servers[name]:
+                logger.info(f"[router] Dropping equipment server {name}")
+                await self.sessions.pop(name).close()
+        for name, url in servers.items():
+            if name not in self.sessions:
+                logger.info(f"[router] Adding equipment server {name} ({url})")
+                self.sessions[name] = PersistentMCPClient(url)
+        return servers
+
+    async def refresh_tools(self) -> list:
+        names = list(self.sessions)
+        catalogues = await asyncio.gather(
+            *(self.sessions[name].list_tools() for name in names),
+            return_exceptions=True,
+        )
+        tools = []
+        for name, catalogue in zip(names, catalogues):
+            if isinstance(catalogue, Exception):
+                logger.warning(f"[router] Could not list tools of {name}: {catalogue}")
+                continue
+            for mcp_tool in catalogue:
+                tools.append((f"{name}{TOOL_SEPARATOR}{mcp_tool.name}", name, mcp_tool))
+
+        self.routes = {routed: (server, mcp_tool.name) for routed, server, mcp_tool in tools}
+        logger.info(f"[router] {len(tools)} tools on {len(self.sessions)} equipment servers")
+        return tools
+
+    async def refresh(self) -> list:
+        await self.discover()
+        return await self.refresh_tools()
+
+    async def call(self, routed_name: str, arguments: dict = None):
+        if routed_name not in self.routes:
+            raise KeyError(f"Unknown equipment tool: {routed_name}")
+        server, tool = self.routes[routed_name]
+        return await self.sessions[server].call_tool(tool, arguments or {})
+
+    async def close(self):
+        await asyncio.gather(*(session.close() for session in self.sessions.values()))
+        self.sessions.clear()
+
+
+# Shared router used by the agent tool list.
+mcp_router = MCPRouter()
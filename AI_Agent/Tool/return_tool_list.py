@@ -1,12 +1,22 @@
+import asyncio
+import json
+import time
+from typing import Any, Optional, Union
+
 from langchain.agents import Tool
-from Tool.tool_wrapper import sync_tool_wrapper
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel, Field, create_model
+from Tool.tool_wrapper import sync_tool_wrapper, sync_kwargs_tool_wrapper, runner
 from Tool.mcp_client import (
+    mcp_session,
+    format_tool_result,
     start_manufacturing,
     set_coil_turn,
     calculate_required_turns,
     get_submodels,
     check_available_processes
 )
+from Tool.mcp_router import mcp_router
 
 
 import logging
@@ -14,9 +24,176 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+JSON_TYPES = {
+    "integer": int,
+    "number": float,
+    "string": str,
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+}
 
-def get_tools():
-    logger.info("Loading tools for LangChain agent")
+INCLUDE_EQUIPMENT_TOOLS = False  # also expose the tools of every available equipment MCP server
+PARALLEL_TOOL_NAME = "run_tools_in_parallel"
+MAX_PARALLEL_CALLS = 8          # tool calls of one batch that run at the same time
+# Read-only tools that may share a batch. Batched calls run in no particular order, so anything that
+# writes to a PLC (set_coil_turn, apply_recipe, start_manufacturing, equipment tools, ...) must be
+# called on its own.
+PARALLEL_SAFE_TOOLS = {
+    "get_submodels",
+    "check_available_processes",
+    "calculate_required_turns_make_afpm",
+    "calculate_required_turns_batch",
+    "lookup_turns",
+    "find_feasible_afpm_configs",
+    "get_operation_status",
+    "get_cache_stats",
+    "get_aas_index_status",
+    "get_modbus_pool_status",
+}
+
+# LangChain tools built from the last catalogue, reused until the catalogue version changes.
+_tool_cache = {"version": None, "tools": None}
+
+
+def _union(types: list):
+    types = list(dict.fromkeys(types))
+    return types[0] if len(types) == 1 else Union[tuple(types)]
+
+
+def _json_type(schema: dict):
+    """
+    Map a JSON schema property to a Python type.
+
+    Null branches are dropped (schema_to_model adds Optional), the remaining
+    anyOf branches or type list become a Union and an untyped property is Any.
+    """
+    options = [option for option in schema.get("anyOf", []) if option.get("type") != "null"]
+    if options:
+        return _union([_json_type(option) for option in options])
+    json_type = schema.get("type")
+    if json_type is None:
+        return Any
+    if isinstance(json_type, list):
+        json_types = [t for t in json_type if t != "null"]
+        return _union([_json_type(dict(schema, type=t)) for t in json_types]) if json_types else Any
+    if json_type == "array" and "items" in schema:
+        return list[_json_type(schema["items"])]
+    return JSON_TYPES.get(json_type, Any)
+
+
+def schema_to_model(tool_name: str, schema: dict):
+    required = set(schema.get("required", []))
+    fields = {}
+    for name, prop in schema.get("properties", {}).items():
+        # pydantic cannot model underscore names; those are placeholder parameters on the server.
+        if name.startswith("_"):
+            continue
+        py_type = _json_type(prop)
+        description = prop.get("description") or prop.get("title")
+        if name in required:
+            fields[name] = (py_type, Field(..., description=description))
+        else:
+            fields[name] = (Optional[py_type], Field(prop.get("default"), description=description))
+    return create_model(f"{tool_name}_args", **fields)
+
+
+def build_mcp_tool(mcp_tool, call_tool=None, name=None, description=None) -> StructuredTool:
+    """call_tool(name, arguments) defaults to the main MCP session."""
+    call_tool = call_tool or mcp_session.call_tool
+    name = name or mcp_tool.name
+
+    async def call(**kwargs):
+        arguments = {key: value for key, value in kwargs.items() if value is not None}
+        response = await call_tool(name, arguments)
+        return format_tool_result(response)
+
+    return StructuredTool.from_function(
+        func=sync_kwargs_tool_wrapper(call, name=name),
+        name=name,
+        description=description or mcp_tool.description or mcp_tool.name,
+        args_schema=schema_to_model(name, mcp_tool.inputSchema or {}),
+    )
+
+
+def build_equipment_tools() -> list:
+    try:
+        routed = runner.run(mcp_router.refresh())
+    except Exception as e:
+        logger.error(f"Failed to discover equipment MCP servers: {e}", exc_info=True)
+        return []
+    return [
+        build_mcp_tool(
+            mcp_tool,
+            call_tool=mcp_router.call,
+            name=routed_name,
+            description=f"[{server}] {mcp_tool.description or mcp_tool.name}",
+        )
+        for routed_name, server, mcp_tool in routed
+    ]
+
+
+class ParallelToolCall(BaseModel):
+    tool: str = Field(..., description="Name of the tool to call")
+    args: dict = Field(default_factory=dict, description="Arguments for the tool")
+
+
+class ParallelToolCalls(BaseModel):
+    calls: list[ParallelToolCall] = Field(..., description="Independent tool calls to run together")
+
+
+async def run_parallel_calls(calls) -> str:
+    calls = [call.model_dump() if hasattr(call, "model_dump") else dict(call) for call in calls]
+    rejected = sorted({call["tool"] for call in calls if call["tool"] not in PARALLEL_SAFE_TOOLS})
+    if rejected:
+        # Nothing runs: a partial batch could leave the agent guessing what happened.
+        return json.dumps({
+            "error": f"Not allowed in {PARALLEL_TOOL_NAME}: {', '.join(rejected)}. Only read-only tools "
+                     f"can be batched; call tools that write to the PLC one at a time, in order.",
+            "allowed": sorted(PARALLEL_SAFE_TOOLS),
+        }, indent=2, ensure_ascii=False)
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_CALLS)
+
+    async def run_one(call):
+        name, arguments = call["tool"], call.get("args") or {}
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await mcp_session.call_tool(name, arguments)
+                text = format_tool_result(response)
+                try:
+                    result = {"tool": name, "ok": True, "result": json.loads(text)}
+                except ValueError:
+                    result = {"tool": name, "ok": True, "result": text}
+            except Exception as e:
+                logger.warning(f"Parallel call to {name} failed: {e}")
+                result = {"tool": name, "ok": False, "error": str(e)}
+            result["seconds"] = round(time.perf_counter() - started, 3)
+            return result
+
+    results = await asyncio.gather(*(run_one(call) for call in calls))
+    return json.dumps(results, indent=2, ensure_ascii=False)
+
+
+def build_parallel_tool(tool_names: list) -> StructuredTool:
+    async def call(calls):
+        return await run_parallel_calls(calls)
+
+    return StructuredTool.from_function(
+        func=sync_kwargs_tool_wrapper(call, name=PARALLEL_TOOL_NAME),
+        name=PARALLEL_TOOL_NAME,
+        description=(
+            "Run several independent tool calls at once and get all results together, "
+            "e.g. get_submodels for several processes plus check_available_processes. "
+            "Only batch calls that do not depend on each other's results. Tools that write to the PLC "
+            "are rejected. "
+            f"Available tools: {', '.join(name for name in tool_names if name in PARALLEL_SAFE_TOOLS)}"
+        ),
+        args_schema=ParallelToolCalls,
+    )
+
+
+def get_static_tools():
     tools = [
         Tool.from_function(
             name="start_manufacturing",
@@ -40,8 +217,39 @@ def get_tools():
         ),
         Tool.from_function(
             name="check_available_processes",
-            description="Check which AAS-defined processes are currently reachable (ping + MCP check).",
+            description="Check which AAS-defined processes are currently reachable (TCP connect to each device's MCP port).",
             func=sync_tool_wrapper(check_available_processes)
         )
     ]
     return tools
+
+
+def get_tools():
+    """
+    Build LangChain tools from the MCP server's tool catalogue.
+
+    The catalogue is cached by the shared MCP session and the LangChain tools
+    are only rebuilt when it changes. If the server cannot be reached, the
+    hand-written tool list is returned instead. With INCLUDE_EQUIPMENT_TOOLS,
+    the tools of every available equipment server are added under
+    "<server>__<tool>" names and routed through mcp_router. A
+    run_tools_in_parallel tool lets the agent execute a batch of independent
+    calls concurrently in a single step.
+    """
+    logger.info("Loading tools for LangChain agent")
+    try:
+        catalogue = runner.run(mcp_session.list_tools())
+    except Exception as e:
+        logger.error(f"Failed to load MCP tool catalogue, using static tools: {e}", exc_info=True)
+        return get_static_tools()
+
+    if _tool_cache["version"] != mcp_session.catalog_version:
+        _tool_cache["tools"] = [build_mcp_tool(mcp_tool) for mcp_tool in catalogue]
+        _tool_cache["version"] = mcp_session.catalog_version
+        logger.info(f"Built {len(_tool_cache['tools'])} tools from MCP catalogue v{mcp_session.catalog_version}")
+
+    tools = list(_tool_cache["tools"])
+    if INCLUDE_EQUIPMENT_TOOLS:
+        tools += build_equipment_tools()
+    tools.append(build_parallel_tool([tool.name for tool in tools]))
+    return tools
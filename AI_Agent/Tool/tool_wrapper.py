@@ -1,10 +1,76 @@
 import asyncio
+import atexit
+import concurrent.futures
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+TOOL_TIMEOUT = 120.0  # seconds a single tool call may take
 
-def sync_tool_wrapper(async_func, param_name=None):
+
+class BackgroundLoopRunner:
+    """
+    Owns one event loop running in a daemon thread.
+
+    Coroutines from synchronous code (LangChain tools) are submitted to this
+    loop, so async resources such as the MCP session or HTTP pools survive
+    between calls instead of dying with a per-call asyncio.run().
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self._loop
+            ready = threading.Event()
+
+            def run():
+                self._loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self._loop)
+                ready.set()
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=run, name="tool-event-loop", daemon=True)
+            self._thread.start()
+            ready.wait()
+            logger.info("Background event loop started.")
+            return self._loop
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_started())
+
+    def run(self, coro, timeout=TOOL_TIMEOUT):
+        """Run coro on the background loop and wait for it. The coroutine is cancelled on timeout."""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Tool call timed out after {timeout}s")
+        except KeyboardInterrupt:
+            future.cancel()
+            raise
+
+    def stop(self):
+        with self._lock:
+            if self._loop is not None and self._loop.is_running():
+                self._loop.call_soon_threadsafe(self._loop.stop)
+            if self._thread is not None:
+                self._thread.join(timeout=5)
+            self._thread = None
+
+
+# Shared runner for all tool wrappers.
+runner = BackgroundLoopRunner()
+atexit.register(runner.stop)
+
+
+def sync_tool_wrapper(async_func, param_name=None, timeout=TOOL_TIMEOUT):
     def wrapper(input):
         try:
             logger.info(f"Calling tool: {async_func.__name__}")
@@ -18,9 +84,9 @@ def sync_tool_wrapper(async_func, param_name=None):
                     logger.debug(f"Converted input to int: {val}")
                 else:
                     val = input
-                result = asyncio.run(async_func(val))
+                result = runner.run(async_func(val), timeout=timeout)
             else:
-                result = asyncio.run(async_func())
+                result = runner.run(async_func(), timeout=timeout)
 
             return result
         except Exception as e:
@@ -29,3 +95,18 @@ def sync_tool_wrapper(async_func, param_name=None):
 
     return wrapper
 
+
+def sync_kwargs_tool_wrapper(async_func, name=None, timeout=TOOL_TIMEOUT):
+    """Like sync_tool_wrapper, for structured tools that receive keyword arguments."""
+    tool_name = name or async_func.__name__
+
+    def wrapper(**kwargs):
+        try:
+            logger.info(f"Calling tool: {tool_name}")
+            logger.debug(f"Arguments received: {kwargs}")
+            return runner.run(async_func(**kwargs), timeout=timeout)
+        except Exception as e:
+            logger.error(f"Error in tool '{tool_name}': {e}", exc_info=True)
+            return f"❌ Exception: {e}"
+
+    return wrapper
@@ -0,0 +1,255 @@
+import base64
+import json
+import logging
+import threading
+
+try:
+    import paho.mqtt.client as mqtt
+except ImportError:  # optional dependency, only needed when MQTT_ENABLED is set
+    mqtt = None
+
+logger = logging.getLogger(__name__)
+
+
+def _specific_asset_id(shell: dict, name: str, default=None):
+    specific_ids = shell.get("assetInformation", {}).get("specificAssetIds", [])
+    return next((s["value"] for s in specific_ids if s.get("name") == name), default)
+
+
+class AasIndex:
+    """
+    In-memory index of shells, device endpoints and submodels.
+
+    The shell list is primed from one registry download and then kept current
+    by BaSyx MQTT events. While the subscriber is connected the index is
+    "live" and can answer lookups without touching the repository. A broker
+    disconnect drops the primed state, because events may have been missed.
+
+    Every connect and disconnect bumps the connection generation. A registry
+    download only primes the index if the generation it started in is still
+    the current, connected one, so a download that began before the
+    subscription (and may miss its events) never marks the index live.
+    Submodels are dropped on every connection change, and submodels read over
+    HTTP are only kept if they were requested in the current, connected
+    generation, so nothing fetched while events could be missed is served
+    as live.
+    """
+
+    def __init__(self):
+        self._shells = {}
+        self._endpoints = {}
+        self._submodels = {}
+        self._lock = threading.Lock()
+        self.primed = False
+        self.connected = False
+        self.generation = 0
+        self.events = 0
+
+    def is_live(self) -> bool:
+        return self.connected and self.primed
+
+    def connection_generation(self) -> int:
+        """Take this before starting a registry download and pass it to load_shells."""
+        with self._lock:
+            return self.generation
+
+    def set_connected(self, connected: bool):
+        with self._lock:
+            self.generation += 1
+            self.connected = connected
+            self.primed = False
+            self._submodels.clear()
+
+    # ── shells ─────────────────────────────
+    def load_shells(self, shells, generation=None):
+        with self._lock:
+            self._shells.clear()
+            self._endpoints.clear()
+            for shell in shells:
+                if isinstance(shell, dict) and "id" in shell:
+                    self._put_shell(shell)
+            self.primed = self.connected and generation == self.generation
+        if self.primed:
+            logger.info(f"[aas_index] Primed with {len(self._shells)} shells")
+        else:
+            logger.info(f"[aas_index] Loaded {len(self._shells)} shells (not primed: not subscribed to MQTT for the whole download)")
+
+    def _put_shell(self, shell: dict):
+        self._shells[shell["id"]] = shell
+        self._endpoints[shell["id"]] = {
+            "aas_name": shell.get("idShort", "Unnamed AAS"),
+            "ip": _specific_asset_id(shell, "ip"),
+            "port": _specific_asset_id(shell, "port", "9000"),
+        }
+
+    def upsert_shell(self, shell: dict):
+        """Returns the (previous, current) endpoint of the shell."""
+        with self._lock:
+            previous = self._endpoints.get(shell["id"])
+            self._put_shell(shell)
+            return previous, self._endpoints[shell["id"]]
+
+    def remove_shell(self, shell_id):
+        with self._lock:
+            self._shells.pop(shell_id, None)
+            return self._endpoints.pop(shell_id, None)
+
+    def shells(self) -> list:
+        with self._lock:
+            return list(self._shells.values())
+
+    def endpoints(self) -> list:
+        with self._lock:
+            return list(self._endpoints.values())
+
+    # ── submodels ──────────────────────────
+    def upsert_submodel(self, submodel: dict, generation=None):
+        """generation: connection_generation() taken before an HTTP read; event updates pass None."""
+        if isinstance(submodel, dict) and "id" in submodel:
+            with self._lock:
+                if generation is not None and not (self.connected and generation == self.generation):
+                    return
+                self._submodels[submodel["id"]] = submodel
+
+    def remove_submodel(self, submodel_id):
+        with self._lock:
+            return self._submodels.pop(submodel_id, None)
+
+    def get_submodel(self, submodel_id):
+        with self._lock:
+            return self._submodels.get(submodel_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "live": self.is_live(),
+                "connected": self.connected,
+                "primed": self.primed,
+                "generation": self.generation,
+                "shells": len(self._shells),
+                "submodels": len(self._submodels),
+                "events": self.events,
+            }
+
+
+class AasEventSubscriber:
+    """
+    Background MQTT subscriber for BaSyx repository events.
+
+    Topics (BaSyx v2):
+      aas-repository/<repo>/shells/created
+      aas-repository/<repo>/shells/<id>/updated|deleted
+      submodel-repository/<repo>/submodels/created
+      submodel-repository/<repo>/submodels/<id>/updated|deleted
+      submodel-repository/<repo>/submodels/<id>/submodelElements/<path>/...
+
+    on_shell_change(endpoint) is called for the old and new endpoint of a
+    changed shell, on_submodel_change(submodel_id) for every touched submodel.
+    Both run on the MQTT network thread so the owner can drop dependent cache
+    entries.
+    """
+
+    TOPICS = ["aas-repository/+/shells/#", "submodel-repository/+/submodels/#"]
+
+    def __init__(self, index: AasIndex, host, port=1883, client_id="a2m-mcp-server",
+                 on_shell_change=None, on_submodel_change=None):
+        self.index = index
+        self.host = host
+        self.port = port
+        self.client_id = client_id
+        self.on_shell_change = on_shell_change
+        self.on_submodel_change = on_submodel_change
+        self._client = None
+
+    def start(self) -> bool:
+        if mqtt is None:
+            logger.warning("[aas_index] paho-mqtt is not installed, MQTT subscriber disabled.")
+            return False
+        if hasattr(mqtt, "CallbackAPIVersion"):  # paho-mqtt >= 2.0
+            self._client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=self.client_id)
+        else:
+            self._client = mqtt.Client(client_id=self.client_id)
+        self._client.on_connect = self._on_connect
+        self._client.on_disconnect = self._on_disconnect
+        self._client.on_message = self._on_message
+        self._client.reconnect_delay_set(min_delay=1, max_delay=30)
+        self._client.connect_async(self.host, self.port)
+        self._client.loop_start()
+        logger.info(f"[aas_index] MQTT subscriber started ({self.host}:{self.port})")
+        return True
+
+    def stop(self):
+        if self._client is not None:
+            self._client.loop_stop()
+            self._client.disconnect()
+            self._client = None
+        self.index.set_connected(False)
+
+    def _on_connect(self, client, userdata, flags, reason_code, properties=None):
+        if getattr(reason_code, "is_failure", reason_code != 0):
+            logger.warning(f"[aas_index] MQTT connect refused: {reason_code}")
+            return
+        for topic in self.TOPICS:
+            client.subscribe(topic)
+        self.index.set_connected(True)
+        logger.info(f"[aas_index] ✅ Subscribed to {self.TOPICS}")
+
+    def _on_disconnect(self, client, userdata, *args):
+        # Events published while we are away are lost, so the index has to be re-primed.
+        self.index.set_connected(False)
+        logger.warning("[aas_index] MQTT disconnected, falling back to HTTP lookups.")
+
+    def _on_message(self, client, userdata, message):
+        self.index.events += 1
+        parts = message.topic.split("/")
+        try:
+            payload = json.loads(message.payload.decode("utf-8")) if message.payload else None
+        except ValueError:
+            payload = None
+        try:
+            if parts[0] == "aas-repository" and len(parts) >= 4 and parts[2] == "shells":
+                self._handle_shell_event(parts[-1], payload)
+            elif parts[0] == "submodel-repository" and len(parts) >= 4 and parts[2] == "submodels":
+                self._handle_submodel_event(parts, payload)
+        except Exception as e:
+            logger.error(f"[aas_index] Failed to apply event {message.topic}: {e}", exc_info=True)
+
+    def _handle_shell_event(self, action, shell):
+        if not isinstance(shell, dict) or "id" not in shell:
+            return
+        if action == "deleted":
+            changed = [self.index.remove_shell(shell["id"])]
+        else:
+            changed = list(self.index.upsert_shell(shell))
+        logger.info(f"[aas_index] Shell {action}: {shell.get('idShort', shell['id'])}")
+        if self.on_shell_change:
+            for endpoint in changed:
+                if endpoint:
+                    self.on_shell_change(endpoint)
+
+    def _handle_submodel_event(self, parts, submodel):
+        action = parts[-1]
+        element_event = "submodelElements" in parts
+        if element_event or not isinstance(submodel, dict):
+            # Element-level events only carry the element, so drop the whole submodel
+            # and let the next lookup fetch it again.
+            submodel_id = _decode_id(parts[3])
+            self.index.remove_submodel(submodel_id)
+        elif action == "deleted":
+            submodel_id = submodel.get("id")
+            self.index.remove_submodel(submodel_id)
+        else:
+            submodel_id = submodel.get("id")
+            self.index.upsert_submodel(submodel)
+        logger.info(f"[aas_index] Submodel {action}: {submodel_id}")
+        if self.on_submodel_change and submodel_id:
+            self.on_submodel_change(submodel_id)
+
+
+def _decode_id(encoded: str):
+    """BaSyx puts base64url encoded ids into topics."""
+    try:
+        padded = encoded + "=" * (-len(encoded) % 4)
+        return base64.urlsafe_b64decode(padded).decode("utf-8")
+    except ValueError:
+        return encoded
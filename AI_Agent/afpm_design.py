@@ -0,0 +1,161 @@
+import math
+from functools import lru_cache
+
+import numpy as np
+
+
+# Default AFPM geometry used by calculate_required_turns_make_afpm.
+RADIUS_OUTER = 0.25   # m
+RADIUS_INNER = 0.05   # m
+B_G = 1.2             # T, air-gap flux density
+CURRENT = 15.0        # A
+K_WINDING = 0.95      # winding factor
+
+
+@lru_cache(maxsize=1024)
+def turn_denominator(radius_outer, radius_inner, B_g, current, k_winding) -> float:
+    """Torque per turn (Nm): (2/3)·π·k·I·B·(ro²−ri²)·r_avg. Cached per geometry."""
+    radius_avg = (radius_outer + radius_inner) / 2
+    area = radius_outer**2 - radius_inner**2
+    return (2/3) * math.pi * k_winding * current * B_g * area * radius_avg
+
+
+def turn_denominator_array(radius_outer, radius_inner, B_g, current, k_winding) -> np.ndarray:
+    """Vectorized turn_denominator; all arguments broadcast against each other."""
+    radius_outer = np.asarray(radius_outer, dtype=float)
+    radius_inner = np.asarray(radius_inner, dtype=float)
+    radius_avg = (radius_outer + radius_inner) / 2
+    area = radius_outer**2 - radius_inner**2
+    return (2/3) * np.pi * np.asarray(k_winding, dtype=float) * np.asarray(current, dtype=float) \
+        * np.asarray(B_g, dtype=float) * area * radius_avg
+
+
+def required_turns_array(torques, radius_outer=RADIUS_OUTER, radius_inner=RADIUS_INNER,
+                         B_g=B_G, current=CURRENT, k_winding=K_WINDING) -> np.ndarray:
+    """
+    Turns for every torque of a sweep (unrounded).
+
+    Geometry parameters may be scalars or arrays broadcastable to the torques.
+    With scalar geometry the cached scalar denominator is used.
+    """
+    torques = np.asarray(torques, dtype=float)
+    geometry = (radius_outer, radius_inner, B_g, current, k_winding)
+    if all(np.ndim(value) == 0 for value in geometry):
+        denominator = turn_denominator(*(float(value) for value in geometry))
+    else:
+        denominator = turn_denominator_array(*geometry)
+    if np.any(denominator == 0):
+        raise ValueError("Denominator cannot be zero")
+    return torques / denominator
+
+
+# ── Lookup table (torque per turn over current × B_g × radii) ──────────────
+AXIS_NAMES = ("current", "B_g", "radius_outer", "radius_inner")
+DEFAULT_AXES = {
+    "current": np.linspace(5.0, 30.0, 26),        # A
+    "B_g": np.linspace(0.6, 1.6, 11),             # T
+    "radius_outer": np.linspace(0.10, 0.30, 21),  # m
+    "radius_inner": np.linspace(0.02, 0.08, 7),   # m
+}
+
+
+class TurnLookupTable:
+    """
+    Precomputed torque-per-turn grid for inverse design queries.
+
+    Turns are linear in torque, so the table stores the geometry constant
+    torque/turn for every grid configuration (k_winding fixed):
+
+    - turns_for(): multilinear interpolation between grid points, located with
+      a binary search per axis
+    - feasible(): configurations sorted by torque/turn, so "turns <= Z for
+      torque X" (torque/turn >= X/Z) is a single binary search
+    """
+
+    def __init__(self, axes: dict, torque_per_turn: np.ndarray, k_winding: float):
+        self.axes = {name: np.asarray(axes[name], dtype=float) for name in AXIS_NAMES}
+        self.grid = torque_per_turn
+        self.k_winding = k_winding
+        flat = self.grid.ravel()
+        valid = np.flatnonzero(np.isfinite(flat) & (flat > 0))
+        order = np.argsort(flat[valid], kind="stable")
+        self.sorted_index = valid[order]
+        self.sorted_values = flat[self.sorted_index]
+
+    @classmethod
+    def build(cls, axes=None, k_winding=K_WINDING):
+        axes = axes or DEFAULT_AXES
+        mesh = np.meshgrid(*(axes[name] for name in AXIS_NAMES), indexing="ij")
+        current, B_g, radius_outer, radius_inner = mesh
+        grid = turn_denominator_array(radius_outer, radius_inner, B_g, current, k_winding)
+        grid = np.where(radius_outer > radius_inner, grid, np.nan)
+        return cls(axes, grid, k_winding)
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            torque_per_turn=self.grid,
+            k_winding=self.k_winding,
+            **{f"axis_{name}": self.axes[name] for name in AXIS_NAMES},
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            axes = {name: data[f"axis_{name}"] for name in AXIS_NAMES}
+            return cls(axes, data["torque_per_turn"], float(data["k_winding"]))
+
+    @classmethod
+    def load_or_build(cls, path, axes=None, k_winding=K_WINDING):
+        """Load the persisted table, rebuilding it when missing or built for other axes."""
+        axes = axes or DEFAULT_AXES
+        try:
+            table = cls.load(path)
+            if table.k_winding == k_winding and all(
+                np.array_equal(table.axes[name], axes[name]) for name in AXIS_NAMES
+            ):
+                return table
+        except (OSError, KeyError, ValueError):
+            pass
+        table = cls.build(axes, k_winding)
+        table.save(path)
+        return table
+
+    def _locate(self, name, value):
+        axis = self.axes[name]
+        if not axis[0] <= value <= axis[-1]:
+            raise ValueError(f"{name}={value} outside table range [{axis[0]}, {axis[-1]}]")
+        i = int(np.searchsorted(axis, value, side="right")) - 1
+        i = min(max(i, 0), len(axis) - 2)
+        return i, (value - axis[i]) / (axis[i + 1] - axis[i])
+
+    def torque_per_turn(self, current, B_g, radius_outer, radius_inner) -> float:
+        point = {"current": current, "B_g": B_g, "radius_outer": radius_outer, "radius_inner": radius_inner}
+        located = [self._locate(name, point[name]) for name in AXIS_NAMES]
+        value = 0.0
+        for corner in np.ndindex(*(2,) * len(AXIS_NAMES)):
+            weight = 1.0
+            index = []
+            for (i, t), bit in zip(located, corner):
+                weight *= t if bit else 1.0 - t
+                index.append(i + bit)
+            if weight:
+                value += weight * self.grid[tuple(index)]
+        if not np.isfinite(value) or value <= 0:
+            raise ValueError("Geometry outside the valid table region (radius_outer must exceed radius_inner)")
+        return float(value)
+
+    def turns_for(self, torque, current, B_g, radius_outer, radius_inner) -> float:
+        return torque / self.torque_per_turn(current, B_g, radius_outer, radius_inner)
+
+    def feasible(self, torque, max_turns, limit=10) -> dict:
+        """Configurations reaching torque with at most max_turns, lowest torque/turn first."""
+        threshold = torque / max_turns
+        start = int(np.searchsorted(self.sorted_values, threshold, side="left"))
+        configs = []
+        for flat_index in self.sorted_index[start:start + limit]:
+            index = np.unravel_index(flat_index, self.grid.shape)
+            config = {name: round(float(self.axes[name][i]), 4) for name, i in zip(AXIS_NAMES, index)}
+            config["turns"] = math.ceil(torque / self.grid[index] - 1e-9)
+            configs.append(config)
+        return {"count": int(self.sorted_values.size - start), "configs": configs}
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import logging
+from collections import namedtuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+HttpResponse = namedtuple("HttpResponse", ["status", "headers", "body"])
+
+
+class BasyxHttpClient:
+    """
+    Long-lived async HTTP client for the BaSyx registry and repositories.
+
+    All requests share one aiohttp session, so connections are kept alive and
+    reused instead of being opened per tool call. Connection errors, timeouts
+    and 5xx responses are retried with exponential backoff.
+    """
+
+    def __init__(self, timeout=10.0, retries=2, backoff=0.3, pool_size=32, keepalive=30.0):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.keepalive = keepalive
+        self._session = None
+        self._loop = None
+        self._closing = set()  # close() tasks of replaced sessions
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._close_stale_session(loop)
+            logger.info(f"[basyx_client] Opening HTTP session (pool_size={self.pool_size})")
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=self.keepalive)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._loop = loop
+        return self._session
+
+    async def get(self, url, headers=None) -> HttpResponse:
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                async with self._get_session().get(url, headers=headers) as response:
+                    if response.status >= 500 and not last_attempt:
+                        logger.warning(f"[basyx_client] GET {url} -> {response.status}, retrying")
+                    else:
+                        text = await response.text()
+                        return HttpResponse(response.status, response.headers.copy(), _parse_body(text))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if last_attempt:
+                    raise
+                logger.warning(f"[basyx_client] GET {url} failed ({e!r}), retrying")
+            await asyncio.sleep(delay)
+            delay *= 2
+
+    async def get_json(self, url):
+        response = await self.get(url)
+        if response.status >= 400:
+            raise RuntimeError(f"GET {url} returned HTTP {response.status}")
+        return response.body
+
+    def _close_stale_session(self, loop):
+        """Close a session opened on another event loop before it is replaced."""
+        session, owner = self._session, self._loop
+        if session is None or session.closed:
+            return
+        if owner is not None and owner is not loop and owner.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), owner)
+        else:
+            # The owning loop has finished, so release the session from this one.
+            task = loop.create_task(session.close())
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def close(self):
+        session, owner = self._session, self._loop
+        self._session = None
+        self._loop = None
+        if session is None or session.closed:
+            return
+        loop = asyncio.get_running_loop()
+        if owner is not None and owner is not loop and owner.is_running():
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(session.close(), owner))
+        else:
+            await session.close()
+
+
+def _parse_body(text):
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
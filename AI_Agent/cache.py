@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    In-process async cache with a time-to-live and stale-while-revalidate.
+
+    - age < ttl:                fresh, returned as is
+    - ttl <= age < ttl + stale: returned immediately, refreshed in the background
+    - older / missing:          loaded and awaited by the caller
+
+    Concurrent loads of the same key share one task. Failed loads are not cached.
+    """
+
+    def __init__(self, name, ttl, stale_ttl=0.0):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = {}
+        self._loading = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    async def get_or_load(self, key, loader):
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age < self.ttl:
+                self.hits += 1
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._start_load(key, loader)
+                return value
+
+        self.misses += 1
+        # Shield so that a cancelled caller does not cancel a load other callers share.
+        return await asyncio.shield(self._start_load(key, loader))
+
+    async def refresh(self, key, loader):
+        """Bypass the cache for this call, but store the fresh value."""
+        self.misses += 1
+        return await asyncio.shield(self._start_load(key, loader))
+
+    def _start_load(self, key, loader) -> asyncio.Task:
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, loader))
+            # Background refreshes have no awaiting caller; consume their errors here.
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._loading[key] = task
+        return task
+
+    async def _load(self, key, loader):
+        try:
+            value = await loader()
+            self._entries[key] = (value, time.monotonic())
+            return value
+        except Exception as e:
+            logger.warning(f"[{self.name}] Refresh of {key!r} failed: {e}")
+            raise
+        finally:
+            self._loading.pop(key, None)
+
+    def invalidate(self, key=None) -> int:
+        """Drop one key, or everything if key is None. Returns the number of removed entries."""
+        if key is None:
+            count = len(self._entries)
+            self._entries.clear()
+        else:
+            count = 1 if self._entries.pop(key, None) is not None else 0
+        logger.info(f"[{self.name}] Invalidated {count} entries")
+        return count
+
+    def invalidate_where(self, predicate) -> int:
+        """Drop every entry whose key matches predicate(key)."""
+        keys = [key for key in list(self._entries) if predicate(key)]
+        for key in keys:
+            self._entries.pop(key, None)
+        logger.info(f"[{self.name}] Invalidated {len(keys)} entries")
+        return len(keys)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+        }
+
+
+class CachedResponse:
+    def __init__(self, body, etag=None, last_modified=None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.validated_at = time.monotonic()
+
+
+class LRUResponseCache:
+    """
+    Size-bounded LRU cache for HTTP JSON responses.
+
+    Entries younger than fresh_ttl are served without a request. Older entries
+    are revalidated with If-None-Match / If-Modified-Since, so an unchanged
+    resource costs a body-less 304 instead of a full download.
+    """
+
+    def __init__(self, name, max_entries, fresh_ttl):
+        self.name = name
+        self.max_entries = max_entries
+        self.fresh_ttl = fresh_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return time.monotonic() - entry.validated_at < self.fresh_ttl
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def conditional_headers(self, entry) -> dict:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def mark_revalidated(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.validated_at = time.monotonic()
+            self.revalidated += 1
+
+    def put(self, key, body, etag=None, last_modified=None):
+        with self._lock:
+            self._entries[key] = CachedResponse(body, etag, last_modified)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key=None) -> int:
+        with self._lock:
+            if key is None:
+                count = len(self._entries)
+                self._entries.clear()
+            else:
+                count = 1 if self._entries.pop(key, None) is not None else 0
+        logger.info(f"[{self.name}] Invalidated {count} entries")
+        return count
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "fresh_ttl": self.fresh_ttl,
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
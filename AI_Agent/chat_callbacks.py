@@ -0,0 +1,79 @@
+import logging
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+MAX_TOOL_OUTPUT_CHARS = 2000  # tool output shown in the chat; the agent still sees everything
+
+
+class StreamingChatHandler(BaseCallbackHandler):
+    """
+    Streams agent progress into a Streamlit container while the chain runs.
+
+    - LLM tokens are rendered as they arrive, one block per LLM call
+    - every tool call gets a status box that shows its input, output and duration
+
+    Finished tool calls are collected in `timings` as (tool name, seconds).
+    """
+
+    def __init__(self, container):
+        self.container = container
+        self.timings = []
+        self._step = 0
+        self._tokens = ""
+        self._placeholder = None
+        self._llm_started = None
+        self._tools = {}
+
+    # ── LLM ─────────────────────────────────
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self._step += 1
+        self._tokens = ""
+        self._llm_started = time.perf_counter()
+        self._placeholder = self.container.empty()
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        self._tokens += token
+        if self._placeholder is not None:
+            self._placeholder.markdown(f"**Step {self._step}** 💭\n\n{self._tokens}▌")
+
+    def on_llm_end(self, response, **kwargs):
+        duration = time.perf_counter() - (self._llm_started or time.perf_counter())
+        self.timings.append((f"llm (step {self._step})", duration))
+        if self._placeholder is not None:
+            self._placeholder.markdown(f"**Step {self._step}** 💭 _{duration:.1f}s_\n\n{self._tokens}")
+        logger.info(f"[chat] LLM step {self._step} took {duration:.2f}s")
+
+    # ── Tools ───────────────────────────────
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        name = (serialized or {}).get("name", "tool")
+        status = self.container.status(f"🔧 {name} running...", state="running")
+        status.code(str(input_str), language="json")
+        self._tools[run_id] = (name, time.perf_counter(), status)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._finish_tool(run_id, output, "complete", "✅")
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._finish_tool(run_id, error, "error", "❌")
+
+    def _finish_tool(self, run_id, output, state, icon):
+        name, started, status = self._tools.pop(run_id, ("tool", time.perf_counter(), None))
+        duration = time.perf_counter() - started
+        self.timings.append((name, duration))
+        logger.info(f"[chat] Tool {name} finished ({state}) in {duration:.2f}s")
+        if status is not None:
+            text = str(getattr(output, "content", output))
+            if len(text) > MAX_TOOL_OUTPUT_CHARS:
+                text = text[:MAX_TOOL_OUTPUT_CHARS] + " ..."
+            status.write(text)
+            status.update(label=f"{icon} {name} ({duration:.2f}s)", state=state, expanded=False)
+
+    def summary(self) -> str:
+        if not self.timings:
+            return ""
+        total = sum(duration for _, duration in self.timings)
+        slowest = max(self.timings, key=lambda item: item[1])
+        return f"⏱️ {total:.1f}s total, slowest: {slowest[0]} ({slowest[1]:.1f}s)"
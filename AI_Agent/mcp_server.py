@@ -1,14 +1,19 @@
-from fastmcp import FastMCP
-from pymodbus.client import ModbusTcpClient
-import math
-import requests
-import subprocess
-import platform
-import aiohttp
+from fastmcp import FastMCP, Context
+from modbus_pool import (modbus_pool, check_response, coalesce_addresses, write_registers_batch, write_coils_batch,
+                         MAX_ADDRESS, MAX_REGISTERS_PER_WRITE, MAX_COILS_PER_WRITE)
+from probe import ping_host, tcp_probe
+from cache import TTLCache, LRUResponseCache
+from basyx_client import BasyxHttpClient
+from aas_index import AasIndex, AasEventSubscriber
+from operations import OperationRegistry
+from afpm_design import RADIUS_OUTER, RADIUS_INNER, B_G, CURRENT, K_WINDING, turn_denominator, required_turns_array, TurnLookupTable
+from contextlib import asynccontextmanager
+import numpy as np
 import asyncio
-import time
 import logging
 import base64
+import os
+import json
 
 # 🔧 Set Logging
 logging.basicConfig(
@@ -17,78 +22,261 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(server):
+    try:
+        yield
+    finally:
+        # Close the BaSyx HTTP session on the event loop that owns its connections.
+        await basyx_http.close()
+
 # Option
-mcp = FastMCP("PLC Controller")
-PLC_IP = "192.168.0.79"
-PLC_PORT = 502
+mcp = FastMCP("PLC Controller", lifespan=lifespan)
+# PLC_IP/PLC_PORT can point at plc_simulator.py for off-line load tests.
+PLC_IP = os.getenv("PLC_IP", "192.168.0.79")
+PLC_PORT = int(os.getenv("PLC_PORT", 502))
+PLC_UNIT = 1
+START_COIL = 30978
+START_PULSE_SECONDS = 2.0
+TURN_REGISTER = 10000
+REGISTER_MAX = 65535     # holding registers are unsigned 16 bit
+# Named recipe parameters -> holding register address on the AFPM PLC.
+RECIPE_REGISTERS = {
+    "turn": TURN_REGISTER,
+}
 AAS_Server_IP = "http://192.168.0.160:8081/submodels/"
 REGISTRY_URL = "http://192.168.0.160:8081/shells"
+HTTP_TIMEOUT = 10.0
+HTTP_RETRIES = 2         # extra attempts on connection errors / 5xx
+HTTP_POOL_SIZE = 32      # max. keep-alive connections to the BaSyx server
+PROBE_CONCURRENCY = 32   # max. devices probed at the same time
+PROBE_TIMEOUT = 3.0      # seconds per device
+PROBE_MODE = "tcp"       # "tcp": connect to the advertised MCP port, "ping": ICMP via OS ping
+REGISTRY_TTL = 30.0      # seconds the registry shell list is served from cache
+REGISTRY_STALE_TTL = 300.0
+PROBE_TTL = 10.0         # seconds a device reachability result is served from cache
+PROBE_STALE_TTL = 60.0
+SUBMODEL_CACHE_SIZE = 256   # max. submodels kept in memory
+SUBMODEL_FRESH_TTL = 60.0   # seconds before a cached submodel is revalidated with the server
+MQTT_ENABLED = False        # keep an AAS index hot from BaSyx MQTT events (needs paho-mqtt)
+MQTT_HOST = "192.168.0.160"
+MQTT_PORT = 1884            # see BaSyxMinimal/mosquitto/mosquitto.conf
+AFPM_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "afpm_turn_table.npz")
+
+registry_cache = TTLCache("registry_cache", REGISTRY_TTL, REGISTRY_STALE_TTL)
+probe_cache = TTLCache("probe_cache", PROBE_TTL, PROBE_STALE_TTL)
+submodel_cache = LRUResponseCache("submodel_cache", SUBMODEL_CACHE_SIZE, SUBMODEL_FRESH_TTL)
+basyx_http = BasyxHttpClient(timeout=HTTP_TIMEOUT, retries=HTTP_RETRIES, pool_size=HTTP_POOL_SIZE)
+aas_index = AasIndex()
+operations = OperationRegistry()
+background_tasks = set()
 
-def is_ping_successful(output: str) -> bool:
-    output = output.lower()
-    logger.info(output)
-    return (
-        "받음 = 1" in output or
-        "0% 손실" in output
-    ) and not (
-        "연결할 수 없습니다" in output or
-        "요청 시간이 만료되었습니다" in output
-    )
+def manufacturing_process_submodel_id(process_name: str) -> str:
+    return f"https://iacf.kyungnam.ac.kr/ids/sm/1/0/{process_name}/ManufacturingProcess"
+
+def encode_submodel_id(submodel_id: str) -> str:
+    return base64.b64encode(submodel_id.encode("utf-8")).decode("utf-8")
 
 def encode_manufacturing_process_url(process_name: str) -> str:
-    url = f"https://iacf.kyungnam.ac.kr/ids/sm/1/0/{process_name}/ManufacturingProcess"
-    encoded = base64.b64encode(url.encode("utf-8")).decode("utf-8")
-    return encoded
+    return encode_submodel_id(manufacturing_process_submodel_id(process_name))
+
+
+# Precise invalidation from MQTT events (called on the MQTT network thread).
+def on_shell_change(endpoint: dict):
+    registry_cache.invalidate()
+    probe_cache.invalidate_where(lambda key: key[0] == endpoint["aas_name"])
+
+def on_submodel_change(submodel_id: str):
+    submodel_cache.invalidate(encode_submodel_id(submodel_id))
+
+aas_events = AasEventSubscriber(
+    aas_index, MQTT_HOST, MQTT_PORT,
+    on_shell_change=on_shell_change,
+    on_submodel_change=on_submodel_change,
+)
 
 @mcp.tool(description="Gets the features that correspond to the entered process.")
-def get_submodels(value: str):
+async def get_submodels(value: str):
     logger.info(f"[get_submodels] Input: {value}")
     try:
+        if aas_index.is_live():
+            indexed = aas_index.get_submodel(manufacturing_process_submodel_id(value))
+            if indexed is not None:
+                logger.info("[get_submodels] Served from live AAS index")
+                return indexed
+
+        generation = aas_index.connection_generation()
         encoded_Process = encode_manufacturing_process_url(value)
+        cached = submodel_cache.get(encoded_Process)
+        if cached is not None and submodel_cache.is_fresh(cached):
+            submodel_cache.record_hit()
+            logger.info("[get_submodels] Cache hit")
+            return cached.body
+
         search_url = AAS_Server_IP + encoded_Process
-        response = requests.get(search_url)
-        logger.info(f"[get_submodels] Response code: {response.status_code}")
-        return response.json()
+        response = await basyx_http.get(search_url, headers=submodel_cache.conditional_headers(cached))
+        logger.info(f"[get_submodels] Response code: {response.status}")
+        if response.status == 304 and cached is not None:
+            submodel_cache.mark_revalidated(encoded_Process)
+            aas_index.upsert_submodel(cached.body, generation)
+            return cached.body
+
+        submodel_cache.record_miss()
+        body = response.body
+        if response.status == 200:
+            submodel_cache.put(
+                encoded_Process,
+                body,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+            aas_index.upsert_submodel(body, generation)
+        return body
     except Exception as e:
         logger.error(f"[get_submodels] Error: {e}", exc_info=True)
         return {"error": str(e)}
 
-@mcp.tool(description="Start AFPM manufacturing Process")
-def start_manufacturing(value: int):
-    logger.info("[start_manufacturing] Starting process...")
+async def release_start_pulse(operation_id: str):
     try:
-        client = ModbusTcpClient(PLC_IP, port=PLC_PORT)
-        client.connect()
-        client.write_coil(address=30978, value=True, slave=1)
-        time.sleep(2)
-        client.write_coil(address=30978, value=False, slave=1)
-        client.close()
-        logger.info("[start_manufacturing] Manufacturing started successfully.")
-        return {"status": "Start Manufacturing Successfully"}
+        await asyncio.sleep(START_PULSE_SECONDS)
+        await modbus_pool.run(
+            PLC_IP, PLC_PORT, PLC_UNIT,
+            lambda client, unit: check_response(
+                client.write_coil(address=START_COIL, value=False, slave=unit), "write_coil", START_COIL),
+        )
+        operations.finish(operation_id, "completed")
     except Exception as e:
-        logger.error(f"[start_manufacturing] Error: {e}", exc_info=True)
-        return {"error": str(e)}
+        logger.error(f"[start_manufacturing] Failed to release start coil: {e}", exc_info=True)
+        operations.finish(operation_id, "failed", error=str(e))
 
-def ping_host(ip):
-    param = "-n" if platform.system().lower() == "windows" else "-c"
+@mcp.tool(description="Start AFPM manufacturing Process. Returns an operation_id; check it with get_operation_status.")
+async def start_manufacturing(value: int):
+    logger.info("[start_manufacturing] Starting process...")
+    target = {"ip": PLC_IP, "port": PLC_PORT, "unit": PLC_UNIT, "coil": START_COIL}
+    running = operations.find_running("start_manufacturing", **target)
+    if running is not None:
+        logger.info(f"[start_manufacturing] Start pulse already active ({running['operation_id']})")
+        return {"status": "Start already in progress", "operation_id": running["operation_id"]}
+
+    operation = operations.create("start_manufacturing", pulse_seconds=START_PULSE_SECONDS, **target)
     try:
-        result = subprocess.run(
-            ["ping", param, "1", ip],
-            capture_output=True,
-            encoding="cp949",
+        await modbus_pool.run(
+            PLC_IP, PLC_PORT, PLC_UNIT,
+            lambda client, unit: check_response(
+                client.write_coil(address=START_COIL, value=True, slave=unit), "write_coil", START_COIL),
         )
-        return is_ping_successful(result.stdout)
     except Exception as e:
-        logger.error(f"[ping_host] Error pinging {ip}: {e}", exc_info=True)
-        return False
+        logger.error(f"[start_manufacturing] Error: {e}", exc_info=True)
+        operations.finish(operation["operation_id"], "failed", error=str(e))
+        return {"error": str(e), "operation_id": operation["operation_id"]}
+
+    # The coil is released in the background, so the tool returns without holding a worker.
+    task = asyncio.create_task(release_start_pulse(operation["operation_id"]))
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    logger.info("[start_manufacturing] Manufacturing started successfully.")
+    return {"status": "Start Manufacturing Successfully", "operation_id": operation["operation_id"]}
+
+@mcp.tool(description="Get the status of a background PLC operation. Without operation_id, lists recent operations.")
+def get_operation_status(operation_id: str = ""):
+    if not operation_id:
+        return {"operations": operations.recent()}
+    operation = operations.get(operation_id)
+    if operation is None:
+        return {"error": f"Unknown operation: {operation_id}"}
+    return operation
 
+def extract_endpoint(aas: dict):
+    aas_name = aas.get("idShort", "Unnamed AAS")
+    specific_ids = aas.get("assetInformation", {}).get("specificAssetIds", [])
 
-@mcp.tool(description="Check which AAS processes are available (ping + MCP test)")
-async def check_available_processes(_: dict = {}):
+    ip = next((s["value"] for s in specific_ids if s["name"] == "ip"), None)
+    port = next((s["value"] for s in specific_ids if s["name"] == "port"), "9000")
+    return aas_name, ip, port
+
+
+def extract_modbus_port(aas: dict):
+    specific_ids = aas.get("assetInformation", {}).get("specificAssetIds", [])
+    return next((s["value"] for s in specific_ids if s["name"] == "modbus_port"), PLC_PORT)
+
+
+async def probe_aas(aas: dict, semaphore: asyncio.Semaphore, timeout: float,
+                    mode: str = PROBE_MODE, check_modbus: bool = False) -> dict:
+    aas_name, ip, port = extract_endpoint(aas)
+
+    if not ip:
+        logger.warning(f"[{aas_name}] ❌ Missing IP address.")
+        return {"aas_name": aas_name, "ip": None, "port": None, "status": "no_ip"}
+
+    if mode == "ping":
+        async with semaphore:
+            logger.debug(f"[{aas_name}] Pinging {ip}...")
+            try:
+                reachable = await asyncio.wait_for(asyncio.to_thread(ping_host, ip, timeout), timeout + 1)
+            except asyncio.TimeoutError:
+                reachable = False
+
+        if not reachable:
+            logger.warning(f"[{aas_name}] ❌ Ping failed ({ip})")
+            return {"aas_name": aas_name, "ip": ip, "port": port, "status": "ping_failed"}
+
+        logger.info(f"[{aas_name}] ✅ Ping success ({ip}:{port})")
+        return {"aas_name": aas_name, "ip": ip, "port": port, "status": "available"}
+
+    async with semaphore:
+        logger.debug(f"[{aas_name}] Connecting to {ip}:{port}...")
+        latency_ms = await tcp_probe(ip, port, timeout)
+        modbus_port = extract_modbus_port(aas) if check_modbus else None
+        modbus_latency_ms = await tcp_probe(ip, modbus_port, timeout) if check_modbus and latency_ms is not None else None
+
+    entry = {"aas_name": aas_name, "ip": ip, "port": port, "latency_ms": latency_ms}
+    if latency_ms is None:
+        logger.warning(f"[{aas_name}] ❌ MCP port closed ({ip}:{port})")
+        entry["status"] = "port_closed"
+        return entry
+
+    if check_modbus:
+        entry["modbus_port"] = modbus_port
+        entry["modbus_latency_ms"] = modbus_latency_ms
+        if modbus_latency_ms is None:
+            logger.warning(f"[{aas_name}] ❌ Modbus port closed ({ip}:{modbus_port})")
+            entry["status"] = "modbus_unreachable"
+            return entry
+
+    logger.info(f"[{aas_name}] ✅ TCP connect success ({ip}:{port}, {latency_ms} ms)")
+    entry["status"] = "available"
+    return entry
+
+
+async def fetch_registry():
+    generation = aas_index.connection_generation()
+    response = await basyx_http.get_json(REGISTRY_URL)
+    aas_index.load_shells(response["result"], generation)
+    return response["result"]
+
+
+@mcp.tool(description="Check which AAS processes are available (TCP connect to the MCP port, or ping)")
+async def check_available_processes(
+    _: dict = {},
+    concurrency: int = PROBE_CONCURRENCY,
+    timeout: float = PROBE_TIMEOUT,
+    mode: str = PROBE_MODE,
+    check_modbus: bool = False,
+    stream: bool = False,
+    use_cache: bool = True,
+    ctx: Context = None,
+):
+    # Reject bad arguments before paying for a registry download.
+    if mode not in ("tcp", "ping"):
+        return {"status": "error", "message": f"Unknown probe mode: {mode}", "available": [], "unavailable": []}
     logger.info("[Step 1] Extracting ID and IP Address details for registered process equipment!")
     try:
-        response = requests.get(REGISTRY_URL)
-        aas_list = response.json()["result"]
+        if use_cache and aas_index.is_live():
+            aas_list = aas_index.shells()
+        elif use_cache:
+            aas_list = await registry_cache.get_or_load(REGISTRY_URL, fetch_registry)
+        else:
+            aas_list = await registry_cache.refresh(REGISTRY_URL, fetch_registry)
         logger.info(f"[Step 1] {len(aas_list)} AAS entries retrieved.")
     except Exception as e:
         logger.error("[Step 1] ❌ Failed to fetch AAS registry.", exc_info=True)
@@ -99,48 +287,31 @@ async def check_available_processes(_: dict = {}):
             "unavailable": []
         }
 
-    available = []
-    unavailable = []
+    aas_list = [aas for aas in aas_list if not isinstance(aas, str)]
+    semaphore = asyncio.Semaphore(max(1, concurrency))
 
-    logger.info("[Step 2] Proceed with probing individual process equipment")
-    for aas in aas_list:
-        if isinstance(aas, str):
-            continue
+    async def probe_indexed(index, aas):
+        aas_name, ip, port = extract_endpoint(aas)
+        key = (aas_name, ip, port, mode, check_modbus)
+        loader = lambda: probe_aas(aas, semaphore, timeout, mode, check_modbus)
+        if use_cache:
+            return index, await probe_cache.get_or_load(key, loader)
+        return index, await probe_cache.refresh(key, loader)
 
-        aas_name = aas.get("idShort", "Unnamed AAS")
-        specific_ids = aas.get("assetInformation", {}).get("specificAssetIds", [])
+    logger.info(f"[Step 2] Probing {len(aas_list)} process equipment (mode={mode}, concurrency={concurrency}, timeout={timeout}s)")
+    results = []
+    tasks = [probe_indexed(i, aas) for i, aas in enumerate(aas_list)]
+    for done, next_result in enumerate(asyncio.as_completed(tasks), start=1):
+        index, entry = await next_result
+        results.append((index, entry))
+        if ctx is not None:
+            await ctx.report_progress(done, len(tasks))
+            if stream:
+                await ctx.info(json.dumps(entry, ensure_ascii=False))
 
-        ip = next((s["value"] for s in specific_ids if s["name"] == "ip"), None)
-        port = next((s["value"] for s in specific_ids if s["name"] == "port"), "9000")
-
-        if not ip:
-            logger.warning(f"[{aas_name}] ❌ Missing IP address.")
-            unavailable.append({
-                "aas_name": aas_name,
-                "ip": None,
-                "port": None,
-                "status": "no_ip"
-            })
-            continue
-
-        logger.debug(f"[{aas_name}] Pinging {ip}...")
-        if not ping_host(ip):
-            logger.warning(f"[{aas_name}] ❌ Ping failed ({ip})")
-            unavailable.append({
-                "aas_name": aas_name,
-                "ip": ip,
-                "port": port,
-                "status": "ping_failed"
-            })
-            continue
-
-        logger.info(f"[{aas_name}] ✅ Ping success ({ip}:{port})")
-        available.append({
-            "aas_name": aas_name,
-            "ip": ip,
-            "port": port,
-            "status": "available"
-        })
+    results.sort(key=lambda item: item[0])
+    available = [entry for _, entry in results if entry["status"] == "available"]
+    unavailable = [entry for _, entry in results if entry["status"] != "available"]
 
     result = {
         "status": "ok",
@@ -152,34 +323,133 @@ async def check_available_processes(_: dict = {}):
     return result
 
 
+@mcp.tool(description="Invalidate cached AAS data. scope: registry, devices, submodels or all")
+def invalidate_cache(scope: str = "all"):
+    logger.info(f"[invalidate_cache] Scope: {scope}")
+    if scope not in ("registry", "devices", "submodels", "all"):
+        return {"error": f"Unknown cache scope: {scope}"}
+    removed = {}
+    if scope in ("registry", "all"):
+        removed["registry"] = registry_cache.invalidate()
+    if scope in ("devices", "all"):
+        removed["devices"] = probe_cache.invalidate()
+    if scope in ("submodels", "all"):
+        removed["submodels"] = submodel_cache.invalidate()
+    return {"status": "invalidated", "removed": removed}
+
+
+@mcp.tool(description="Show hit/miss statistics of the AAS registry, device and submodel caches")
+def get_cache_stats():
+    return {
+        "registry": registry_cache.stats(),
+        "devices": probe_cache.stats(),
+        "submodels": submodel_cache.stats(),
+    }
+
+
+@mcp.tool(description="Show the state of the MQTT-fed AAS index")
+def get_aas_index_status():
+    return aas_index.stats()
+
+
 @mcp.tool(description="Set Coil Turn input value name is only turn")
 def set_coil_turn(value: int):
     logger.info(f"[set_coil_turn] Setting turn: {value}")
     try:
-        client = ModbusTcpClient(PLC_IP, port=PLC_PORT)
-        client.connect()
-        client.write_register(address=10000, value=value, slave=1)
-        client.close()
+        modbus_pool.execute(
+            PLC_IP, PLC_PORT, PLC_UNIT,
+            lambda client, unit: check_response(
+                client.write_register(address=TURN_REGISTER, value=value, slave=unit), "write_register", TURN_REGISTER),
+        )
         logger.info(f"[set_coil_turn] Coil set to: {value}")
         return {"status": f"set Turn coil: {value}"}
     except Exception as e:
         logger.error(f"[set_coil_turn] Error: {e}", exc_info=True)
         return {"error": str(e)}
 
+def resolve_addresses(values: dict, names: dict) -> dict:
+    resolved = {}
+    for key, value in (values or {}).items():
+        if key in names:
+            address = names[key]
+        elif str(key).isdigit():
+            address = int(key)
+        else:
+            raise ValueError(f"Unknown parameter: {key}")
+        if not 0 <= address <= MAX_ADDRESS:
+            raise ValueError(f"Address {key} is outside 0..{MAX_ADDRESS}")
+        resolved[address] = value
+    return resolved
+
+def parse_register_value(address: int, value) -> int:
+    """Integer 0..65535 (numeric strings and integral floats allowed); anything else raises ValueError."""
+    try:
+        if isinstance(value, bool):
+            raise ValueError
+        number = value if isinstance(value, int) else float(str(value).strip())
+    except ValueError:
+        raise ValueError(f"Register {address}: expected an integer 0..{REGISTER_MAX}, got {value!r}")
+    if not 0 <= number <= REGISTER_MAX or number != int(number):
+        raise ValueError(f"Register {address}: expected an integer 0..{REGISTER_MAX}, got {value!r}")
+    return int(number)
+
+def parse_coil_value(address: int, value) -> bool:
+    """True/False, 0/1 or "true"/"false" (any case); anything else raises ValueError."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true"
+    raise ValueError(f"Coil {address}: expected true/false or 0/1, got {value!r}")
+
+@mcp.tool(description="Apply a recipe in one PLC transaction. registers: {name or address: value} "
+                      f"(names: {', '.join(RECIPE_REGISTERS)}), coils: {{address: true/false}}")
+async def apply_recipe(registers: dict = {}, coils: dict = {}):
+    logger.info(f"[apply_recipe] registers={registers}, coils={coils}")
+    try:
+        # Every value is validated before the first write, so a bad entry leaves the PLC untouched.
+        register_values = {address: parse_register_value(address, value)
+                           for address, value in resolve_addresses(registers, RECIPE_REGISTERS).items()}
+        coil_values = {address: parse_coil_value(address, value)
+                       for address, value in resolve_addresses(coils, {}).items()}
+        coalesce_addresses(register_values, MAX_REGISTERS_PER_WRITE)
+        coalesce_addresses(coil_values, MAX_COILS_PER_WRITE)
+
+        def write_block(client, unit):
+            requests = write_registers_batch(client, unit, register_values)
+            requests += write_coils_batch(client, unit, coil_values)
+            return requests
+
+        # The per-device lock is held for the whole recipe, so no other tool interleaves writes.
+        request_count = await modbus_pool.run(PLC_IP, PLC_PORT, PLC_UNIT, write_block)
+        logger.info(f"[apply_recipe] {len(register_values) + len(coil_values)} values written in {request_count} requests")
+        return {
+            "status": "Recipe applied",
+            "registers": register_values,
+            "coils": coil_values,
+            "modbus_requests": request_count,
+        }
+    except Exception as e:
+        logger.error(f"[apply_recipe] Error: {e}", exc_info=True)
+        return {"error": str(e)}
+
+@mcp.tool(description="Show the state of pooled Modbus connections")
+def get_modbus_pool_status():
+    return modbus_pool.stats()
+
 @mcp.tool(description="Enter target torque and return matching coil turn.")
 def calculate_required_turns_make_afpm(
-    value: int,
-    radius_outer=0.25,
-    radius_inner=0.05,
-    B_g=1.2,
-    current=15.0,
-    k_winding=0.95
+    value: float,
+    radius_outer=RADIUS_OUTER,
+    radius_inner=RADIUS_INNER,
+    B_g=B_G,
+    current=CURRENT,
+    k_winding=K_WINDING
 ):
     logger.info(f"[calculate_required_turns] Calculating for torque: {value}")
     try:
-        radius_avg = (radius_outer + radius_inner) / 2
-        area = radius_outer**2 - radius_inner**2
-        denominator = (2/3) * math.pi * k_winding * current * B_g * area * radius_avg
+        denominator = turn_denominator(radius_outer, radius_inner, B_g, current, k_winding)
 
         if denominator == 0:
             raise ValueError("Denominator cannot be zero")
@@ -191,6 +461,70 @@ def calculate_required_turns_make_afpm(
         logger.error(f"[calculate_required_turns] Error: {e}", exc_info=True)
         return {"error": str(e)}
 
+@mcp.tool(description="Turns for a whole sweep of target torques. Geometry parameters may be single values "
+                      "or lists of the same length as torques.")
+def calculate_required_turns_batch(
+    torques: list[float],
+    radius_outer: float | list[float] = RADIUS_OUTER,
+    radius_inner: float | list[float] = RADIUS_INNER,
+    B_g: float | list[float] = B_G,
+    current: float | list[float] = CURRENT,
+    k_winding: float | list[float] = K_WINDING,
+):
+    logger.info(f"[calculate_required_turns_batch] Calculating for {len(torques)} torques")
+    try:
+        turns = required_turns_array(torques, radius_outer, radius_inner, B_g, current, k_winding)
+        return {"count": int(turns.size), "turns": np.rint(turns).astype(int).tolist()}
+    except Exception as e:
+        logger.error(f"[calculate_required_turns_batch] Error: {e}", exc_info=True)
+        return {"error": str(e)}
+
+_turn_table = None
+
+def get_turn_table() -> TurnLookupTable:
+    global _turn_table
+    if _turn_table is None:
+        _turn_table = TurnLookupTable.load_or_build(AFPM_TABLE_PATH)
+        logger.info(f"[turn_table] Loaded {_turn_table.sorted_values.size} AFPM configurations")
+    return _turn_table
+
+@mcp.tool(description="Look up the coil turns for a target torque at a given current, air-gap flux density "
+                      "and radii, interpolated from the precomputed AFPM table.")
+def lookup_turns(
+    torque: float,
+    current: float = CURRENT,
+    B_g: float = B_G,
+    radius_outer: float = RADIUS_OUTER,
+    radius_inner: float = RADIUS_INNER,
+):
+    logger.info(f"[lookup_turns] torque={torque}, current={current}, B_g={B_g}, ro={radius_outer}, ri={radius_inner}")
+    try:
+        table = get_turn_table()
+        turns = table.turns_for(torque, current, B_g, radius_outer, radius_inner)
+        return {"turns": round(turns), "turns_exact": round(turns, 3)}
+    except Exception as e:
+        logger.error(f"[lookup_turns] Error: {e}", exc_info=True)
+        return {"error": str(e)}
+
+@mcp.tool(description="List AFPM configurations (current, B_g, radii) that reach a target torque "
+                      "with at most max_turns coil turns, least aggressive first.")
+def find_feasible_afpm_configs(torque: float, max_turns: int, limit: int = 10):
+    logger.info(f"[find_feasible_afpm_configs] torque={torque}, max_turns={max_turns}")
+    try:
+        if max_turns <= 0:
+            raise ValueError("max_turns must be positive")
+        return get_turn_table().feasible(torque, max_turns, limit)
+    except Exception as e:
+        logger.error(f"[find_feasible_afpm_configs] Error: {e}", exc_info=True)
+        return {"error": str(e)}
+
 if __name__ == "__main__":
     logger.info("🚀 MCP Server starting...")
-    mcp.run(transport="streamable-http", host="192.168.0.79", port=9000)
\ No newline at end of file
+    if MQTT_ENABLED:
+        aas_events.start()
+    try:
+        mcp.run(transport="streamable-http", host=os.getenv("MCP_HOST", "192.168.0.79"), port=int(os.getenv("MCP_PORT", 9000)))
+    finally:
+        aas_events.stop()
+        modbus_pool.close_all()
+        asyncio.run(basyx_http.close())  # no-op if the lifespan already closed it
\ No newline at end of file
@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from pymodbus.client import ModbusTcpClient
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+
+logger = logging.getLogger(__name__)
+
+
+# Option
+IDLE_TIMEOUT = 60.0      # seconds a connection may stay unused before it is closed
+EVICT_INTERVAL = 15.0    # seconds between idle checks of the background evictor
+CONNECT_RETRIES = 3      # reconnect attempts per operation
+BACKOFF_BASE = 0.2       # first reconnect delay (seconds), doubled on every retry
+BACKOFF_MAX = 5.0
+
+
+class ModbusUnavailable(ConnectionError):
+    """The device could not be reached within the reconnect backoff; not retried by execute()."""
+
+
+class PooledConnection:
+    """One persistent Modbus TCP client plus the lock that serializes access to it."""
+
+    def __init__(self, ip, port, unit):
+        self.ip = ip
+        self.port = port
+        self.unit = unit
+        self.client = ModbusTcpClient(ip, port=port)
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.failures = 0
+
+    def is_healthy(self) -> bool:
+        return bool(self.client.connected)
+
+    def close(self):
+        try:
+            self.client.close()
+        except Exception as e:
+            logger.warning(f"[modbus_pool] Error closing {self.ip}:{self.port}: {e}")
+
+
+class ModbusConnectionPool:
+    """
+    Shares persistent Modbus TCP connections between tools.
+
+    Connections are keyed by (ip, port, unit id). Each key has its own lock, so
+    calls to the same PLC are serialized while different PLCs run in parallel.
+    Broken sockets are reconnected with exponential backoff. A background
+    thread closes connections that have been idle for IDLE_TIMEOUT; it runs
+    while the pool holds connections and stops once it is empty.
+    """
+
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, retries=CONNECT_RETRIES,
+                 backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX, evict_interval=EVICT_INTERVAL):
+        self.idle_timeout = idle_timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.evict_interval = evict_interval
+        self._connections = {}
+        self._lock = threading.Lock()
+        self._evictor = None
+
+    def _get_entry(self, ip, port, unit) -> PooledConnection:
+        key = (ip, int(port), int(unit))
+        with self._lock:
+            entry = self._connections.get(key)
+            if entry is None:
+                logger.info(f"[modbus_pool] New connection slot for {key}")
+                entry = PooledConnection(*key)
+                self._connections[key] = entry
+                if self._evictor is None:
+                    self._evictor = threading.Thread(target=self._evict_loop, name="modbus-pool-evictor", daemon=True)
+                    self._evictor.start()
+            return entry
+
+    def _evict_loop(self):
+        while True:
+            time.sleep(self.evict_interval)
+            try:
+                self.evict_idle()
+            except Exception as e:
+                logger.warning(f"[modbus_pool] Idle eviction failed: {e}")
+            with self._lock:
+                if not self._connections:
+                    self._evictor = None
+                    return
+
+    def _ensure_connected(self, entry: PooledConnection):
+        if entry.is_healthy():
+            return
+        delay = self.backoff_base
+        for attempt in range(1, self.retries + 1):
+            entry.close()
+            if entry.client.connect():
+                if entry.failures:
+                    logger.info(f"[modbus_pool] Reconnected to {entry.ip}:{entry.port} (attempt {attempt})")
+                entry.failures = 0
+                return
+            entry.failures += 1
+            logger.warning(f"[modbus_pool] Connect to {entry.ip}:{entry.port} failed (attempt {attempt}/{self.retries})")
+            if attempt < self.retries:
+                time.sleep(delay)
+                delay = min(delay * 2, self.backoff_max)
+        raise ModbusUnavailable(f"Unable to connect to Modbus device {entry.ip}:{entry.port}")
+
+    @contextmanager
+    def connection(self, ip, port, unit=1):
+        """Yield a connected client, holding the per-device lock for the whole block."""
+        entry = self._get_entry(ip, port, unit)
+        with entry.lock:
+            self._ensure_connected(entry)
+            try:
+                yield entry.client
+            finally:
+                entry.last_used = time.monotonic()
+
+    def execute(self, ip, port, unit, operation):
+        """
+        Run operation(client, unit) on a pooled connection.
+
+        If the socket turns out to be dead mid-call, the connection is dropped
+        and the operation is retried once on a fresh one. A device that could
+        not be reached at all (ModbusUnavailable) is not retried, the connect
+        backoff has already been spent.
+        """
+        for attempt in (1, 2):
+            try:
+                with self.connection(ip, port, unit) as client:
+                    return operation(client, unit)
+            except ModbusUnavailable:
+                raise
+            except (ConnectionError, OSError, ConnectionException, ModbusIOException) as e:
+                if attempt == 2:
+                    raise
+                logger.warning(f"[modbus_pool] Operation on {ip}:{port} failed ({e}), retrying on a new connection")
+                self._drop(ip, port, unit)
+
+    async def run(self, ip, port, unit, operation):
+        """Async variant of execute() that keeps the event loop free during Modbus I/O."""
+        return await asyncio.to_thread(self.execute, ip, port, unit, operation)
+
+    def _drop(self, ip, port, unit):
+        key = (ip, int(port), int(unit))
+        with self._lock:
+            entry = self._connections.pop(key, None)
+        if entry is not None:
+            with entry.lock:
+                entry.close()
+
+    def evict_idle(self):
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                key for key, entry in self._connections.items()
+                if now - entry.last_used > self.idle_timeout and not entry.lock.locked()
+            ]
+            evicted = [self._connections.pop(key) for key in idle]
+        for entry in evicted:
+            logger.info(f"[modbus_pool] Closing idle connection {entry.ip}:{entry.port} (unit {entry.unit})")
+            entry.close()
+
+    def close_all(self):
+        with self._lock:
+            entries = list(self._connections.values())
+            self._connections.clear()
+        for entry in entries:
+            entry.close()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "connections": [
+                    {
+                        "ip": entry.ip,
+                        "port": entry.port,
+                        "unit": entry.unit,
+                        "connected": entry.is_healthy(),
+                        "idle_seconds": round(now - entry.last_used, 1),
+                        "failures": entry.failures,
+                    }
+                    for entry in self._connections.values()
+                ]
+            }
+
+
+# Shared pool used by every Modbus-backed tool.
+modbus_pool = ModbusConnectionPool()
+
+
+# ── batched writes ───────────────────────
+MAX_REGISTERS_PER_WRITE = 123   # Modbus limit for function code 16 (write multiple registers)
+MAX_COILS_PER_WRITE = 1968      # Modbus limit for function code 15 (write multiple coils)
+MAX_ADDRESS = 65535             # coils and registers are addressed with 16 bits
+
+
+def coalesce_addresses(values: dict, max_block: int) -> list:
+    """
+    Group {address: value} into (start, [values]) runs of contiguous addresses.
+
+    Raises ValueError for an address or block outside 0..MAX_ADDRESS, so a
+    caller can validate a whole recipe before the first write.
+    """
+    blocks = []
+    for address in sorted(values):
+        if not 0 <= address <= MAX_ADDRESS:
+            raise ValueError(f"Address {address} is outside 0..{MAX_ADDRESS}")
+        if blocks:
+            start, block = blocks[-1]
+            if address == start + len(block) and len(block) < max_block:
+                block.append(values[address])
+                continue
+        blocks.append((address, [values[address]]))
+    for start, block in blocks:
+        if start + len(block) > MAX_ADDRESS + 1:
+            raise ValueError(f"Block of {len(block)} at {start} ends past address {MAX_ADDRESS}")
+    return blocks
+
+
+def check_response(response, what, address):
+    if response is None or response.isError():
+        raise RuntimeError(f"Modbus {what} at {address} failed: {response}")
+
+
+def write_registers_batch(client, unit, values: dict) -> int:
+    """Write holding registers using one request per contiguous block. Returns the request count."""
+    blocks = coalesce_addresses(values, MAX_REGISTERS_PER_WRITE)
+    for start, block in blocks:
+        if len(block) == 1:
+            check_response(client.write_register(address=start, value=block[0], slave=unit), "write_register", start)
+        else:
+            check_response(client.write_registers(address=start, values=block, slave=unit), "write_registers", start)
+    return len(blocks)
+
+
+def write_coils_batch(client, unit, values: dict) -> int:
+    """Write coils using one request per contiguous block. Returns the request count."""
+    blocks = coalesce_addresses(values, MAX_COILS_PER_WRITE)
+    for start, block in blocks:
+        if len(block) == 1:
+            check_response(client.write_coil(address=start, value=block[0], slave=unit), "write_coil", start)
+        else:
+            check_response(client.write_coils(address=start, values=block, slave=unit), "write_coils", start)
+    return len(blocks)
@@ -0,0 +1,63 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class OperationRegistry:
+    """
+    Tracks PLC operations that finish in the background.
+
+    Tools register an operation, return its id right away and update the
+    status when the background part is done. Only the last max_history
+    operations are kept.
+    """
+
+    def __init__(self, max_history=256):
+        self.max_history = max_history
+        self._operations = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, kind, **details) -> dict:
+        operation = {
+            "operation_id": uuid.uuid4().hex[:12],
+            "kind": kind,
+            "status": "running",
+            "started_at": time.time(),
+            "finished_at": None,
+            **details,
+        }
+        with self._lock:
+            self._operations[operation["operation_id"]] = operation
+            while len(self._operations) > self.max_history:
+                self._operations.popitem(last=False)
+        logger.info(f"[operations] {kind} started ({operation['operation_id']})")
+        return dict(operation)
+
+    def finish(self, operation_id, status="completed", **details):
+        with self._lock:
+            operation = self._operations.get(operation_id)
+            if operation is None:
+                return
+            operation.update(status=status, finished_at=time.time(), **details)
+        logger.info(f"[operations] {operation['kind']} {status} ({operation_id})")
+
+    def get(self, operation_id):
+        with self._lock:
+            operation = self._operations.get(operation_id)
+            return dict(operation) if operation else None
+
+    def find_running(self, kind, **match):
+        with self._lock:
+            for operation in reversed(self._operations.values()):
+                if operation["kind"] == kind and operation["status"] == "running" and \
+                        all(operation.get(k) == v for k, v in match.items()):
+                    return dict(operation)
+        return None
+
+    def recent(self, limit=20) -> list:
+        with self._lock:
+            return [dict(op) for op in list(self._operations.values())[-limit:]]
@@ -0,0 +1,274 @@
+"""
+Simulated AFPM PLC speaking Modbus TCP, for load tests off the shop floor.
+
+    python plc_simulator.py serve --port 5020 --latency 0.005 --jitter 0.002 --fault-rate 0.01
+    PLC_IP=127.0.0.1 PLC_PORT=5020 python mcp_server.py
+    python plc_simulator.py bench --port 5020 --requests 2000 --concurrency 8
+
+Every coil and holding register address (0-65535) is writable and readable,
+which covers the AFPM map used by mcp_server.py (start coil 30978, turn
+register 10000) and the 100-260 ranges written by the generated servers.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+# Named addresses of the AFPM line, used for logging only.
+COIL_NAMES = {30978: "start_manufacturing"}
+REGISTER_NAMES = {10000: "coil_turn"}
+
+# Modbus exception codes
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+ILLEGAL_DATA_VALUE = 0x03
+SERVER_DEVICE_FAILURE = 0x04
+
+
+class PLCSimulator:
+    """
+    Minimal Modbus TCP server with an in-memory coil/register store.
+
+    Supported function codes: 1, 2 (read coils), 3, 4 (read registers),
+    5, 6 (write single), 15, 16 (write multiple).
+
+    latency/jitter delay every response; fault_rate answers with a
+    SERVER_DEVICE_FAILURE exception and drop_rate closes the connection
+    without answering, to exercise client retry paths.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, fault_rate=0.0, drop_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.fault_rate = fault_rate
+        self.drop_rate = drop_rate
+        self.coils = {}
+        self.registers = {}
+        self.random = random.Random(seed)
+        self.stats = {"connections": 0, "requests": 0, "faults": 0, "drops": 0, "start_pulses": 0}
+        self._server = None
+
+    # ── store ──────────────────────────────
+    def _write_coil(self, address, value):
+        if address in COIL_NAMES and value and not self.coils.get(address):
+            self.stats["start_pulses"] += 1
+            logger.debug(f"[plc_simulator] {COIL_NAMES[address]} rising edge (#{self.stats['start_pulses']})")
+        self.coils[address] = value
+
+    def _write_register(self, address, value):
+        if address in REGISTER_NAMES:
+            logger.debug(f"[plc_simulator] {REGISTER_NAMES[address]} = {value}")
+        self.registers[address] = value
+
+    # ── protocol ───────────────────────────
+    def handle_pdu(self, pdu: bytes) -> bytes:
+        function = pdu[0]
+        try:
+            if function in (0x01, 0x02):
+                start, count = struct.unpack(">HH", pdu[1:5])
+                self._check_range(start, count, 2000)
+                bits = [self.coils.get(start + i, False) for i in range(count)]
+                packed = bytearray((count + 7) // 8)
+                for i, bit in enumerate(bits):
+                    if bit:
+                        packed[i // 8] |= 1 << (i % 8)
+                return bytes([function, len(packed)]) + bytes(packed)
+            if function in (0x03, 0x04):
+                start, count = struct.unpack(">HH", pdu[1:5])
+                self._check_range(start, count, 125)
+                values = [self.registers.get(start + i, 0) for i in range(count)]
+                return bytes([function, count * 2]) + struct.pack(f">{count}H", *values)
+            if function == 0x05:
+                address, raw = struct.unpack(">HH", pdu[1:5])
+                if raw not in (0x0000, 0xFF00):
+                    raise ModbusError(ILLEGAL_DATA_VALUE)
+                self._write_coil(address, raw == 0xFF00)
+                return pdu[:5]
+            if function == 0x06:
+                address, value = struct.unpack(">HH", pdu[1:5])
+                self._write_register(address, value)
+                return pdu[:5]
+            if function == 0x0F:
+                start, count, byte_count = struct.unpack(">HHB", pdu[1:6])
+                self._check_range(start, count, 1968)
+                data = pdu[6:6 + byte_count]
+                for i in range(count):
+                    self._write_coil(start + i, bool(data[i // 8] >> (i % 8) & 1))
+                return pdu[:5]
+            if function == 0x10:
+                start, count, byte_count = struct.unpack(">HHB", pdu[1:6])
+                self._check_range(start, count, 123)
+                values = struct.unpack(f">{count}H", pdu[6:6 + byte_count])
+                for i, value in enumerate(values):
+                    self._write_register(start + i, value)
+                return pdu[:5]
+            raise ModbusError(ILLEGAL_FUNCTION)
+        except ModbusError as e:
+            return bytes([function | 0x80, e.code])
+        except struct.error:
+            return bytes([function | 0x80, ILLEGAL_DATA_VALUE])
+
+    @staticmethod
+    def _check_range(start, count, max_count):
+        if not 1 <= count <= max_count:
+            raise ModbusError(ILLEGAL_DATA_VALUE)
+        if start + count > 0x10000:
+            raise ModbusError(ILLEGAL_DATA_ADDRESS)
+
+    async def _handle_connection(self, reader, writer):
+        self.stats["connections"] += 1
+        try:
+            while True:
+                header = await reader.readexactly(7)
+                transaction, protocol, length, unit = struct.unpack(">HHHB", header)
+                pdu = await reader.readexactly(length - 1)
+                self.stats["requests"] += 1
+
+                delay = self.latency + self.random.uniform(-self.jitter, self.jitter)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if self.random.random() < self.drop_rate:
+                    self.stats["drops"] += 1
+                    break
+                if self.random.random() < self.fault_rate:
+                    self.stats["faults"] += 1
+                    response = bytes([pdu[0] | 0x80, SERVER_DEVICE_FAILURE])
+                else:
+                    response = self.handle_pdu(pdu)
+                writer.write(struct.pack(">HHHB", transaction, protocol, len(response) + 1, unit) + response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=5020):
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"[plc_simulator] Listening on {host}:{port}")
+        return port
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+class ModbusError(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+
+def run_in_thread(simulator: PLCSimulator, host="127.0.0.1", port=0) -> int:
+    """Start the simulator on a daemon thread (for tests and harnesses). Returns the bound port."""
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    bound = {}
+
+    def run():
+        asyncio.set_event_loop(loop)
+        bound["port"] = loop.run_until_complete(simulator.start(host, port))
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, name="plc-simulator", daemon=True).start()
+    started.wait()
+    return bound["port"]
+
+
+# ── Benchmark through the shared connection pool ─────────────────────────────
+def benchmark(host, port, requests, concurrency):
+    from modbus_pool import modbus_pool
+
+    def one_call(i):
+        unit = 1 + i % concurrency  # one pooled connection per worker
+        started = time.perf_counter()
+        try:
+            response = modbus_pool.execute(
+                host, port, unit,
+                lambda client, unit: client.write_register(address=10000, value=i % 1000, slave=unit),
+            )
+            ok = not response.isError()
+        except Exception:
+            ok = False
+        return ok, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one_call, range(requests)))
+    elapsed = time.perf_counter() - started
+    modbus_pool.close_all()
+
+    latencies = sorted(duration * 1000 for ok, duration in results if ok)
+    failures = sum(1 for ok, _ in results if not ok)
+    report = {
+        "requests": requests,
+        "concurrency": concurrency,
+        "failures": failures,
+        "throughput_rps": round(requests / elapsed, 1),
+    }
+    if latencies:
+        report.update({
+            "p50_ms": round(statistics.median(latencies), 2),
+            "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+            "max_ms": round(latencies[-1], 2),
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated AFPM Modbus TCP PLC")
+    sub = parser.add_subparsers(dest="command")
+
+    serve = sub.add_parser("serve", help="run the simulator")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=5020)
+    serve.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    serve.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of random latency")
+    serve.add_argument("--fault-rate", type=float, default=0.0, help="share of requests answered with a device failure")
+    serve.add_argument("--drop-rate", type=float, default=0.0, help="share of requests that drop the connection")
+    serve.add_argument("--seed", type=int, default=None)
+
+    bench = sub.add_parser("bench", help="load-test a running simulator through modbus_pool")
+    bench.add_argument("--host", default="127.0.0.1")
+    bench.add_argument("--port", type=int, default=5020)
+    bench.add_argument("--requests", type=int, default=1000)
+    bench.add_argument("--concurrency", type=int, default=8)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    if args.command == "bench":
+        print(benchmark(args.host, args.port, args.requests, args.concurrency))
+        return
+
+    if args.command is None:
+        args = serve.parse_args([])
+    simulator = PLCSimulator(args.latency, args.jitter, args.fault_rate, args.drop_rate, args.seed)
+
+    async def serve_forever():
+        await simulator.start(args.host, args.port)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await simulator.stop()
+            logger.info(f"[plc_simulator] Stats: {simulator.stats}")
+
+    try:
+        asyncio.run(serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
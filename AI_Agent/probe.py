@@ -0,0 +1,56 @@
+import asyncio
+import logging
+import platform
+import subprocess
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# ── ICMP ping (legacy mode, spawns one OS process per host) ──────────────
+def is_ping_successful(output: str) -> bool:
+    output = output.lower()
+    logger.info(output)
+    return (
+        "받음 = 1" in output or
+        "0% 손실" in output
+    ) and not (
+        "연결할 수 없습니다" in output or
+        "요청 시간이 만료되었습니다" in output
+    )
+
+
+def ping_host(ip, timeout=None):
+    param = "-n" if platform.system().lower() == "windows" else "-c"
+    try:
+        result = subprocess.run(
+            ["ping", param, "1", ip],
+            capture_output=True,
+            encoding="cp949",
+            timeout=timeout,
+        )
+        return is_ping_successful(result.stdout)
+    except subprocess.TimeoutExpired:
+        logger.warning(f"[ping_host] Ping to {ip} timed out after {timeout}s")
+        return False
+    except Exception as e:
+        logger.error(f"[ping_host] Error pinging {ip}: {e}", exc_info=True)
+        return False
+
+
+# ── TCP connect (default mode, checks that the service port accepts connections) ──
+async def tcp_probe(ip, port, timeout):
+    """Open and immediately close a TCP connection. Returns the connect time in ms, or None."""
+    start = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(ip, int(port)), timeout)
+    except (OSError, ValueError, asyncio.TimeoutError) as e:
+        logger.debug(f"[tcp_probe] {ip}:{port} unreachable: {e!r}")
+        return None
+    latency_ms = round((time.perf_counter() - start) * 1000, 2)
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return latency_ms
@@ -1,8 +1,10 @@
 import streamlit as st
 from langchain.agents import initialize_agent,AgentType
-from langchain_community.callbacks.streamlit import StreamlitCallbackHandler
 from langchain.llms import Ollama
 import Tool.return_tool_list as tf2
+from chat_callbacks import StreamingChatHandler
+from Tool import fast_path
+import time
 import logging
 
 # set Logging Option
@@ -34,28 +36,65 @@ if "chat_history" not in st.session_state:
     logger.info("Initialized new chat history in session state.")
 
 # Define system prompt.
-SYSTEM_PROMPT = """You are an expert AI assistant who leverages digital twins (Asset Administration Shell, AAS) and industrial agents to control manufacturing processes. You are well-versed in digital representations of factory equipment and processes, and have a good understanding of industrial protocols such as OPC UA and the concept of equipment health (availability). When it receives a request from a user to control a manufacturing process, it analyzes the problem in a logical step-by-step manner and solves it by utilizing the appropriate tools in sequence. At each step, it clearly identifies what needs to be done, chooses the appropriate tool from the ones provided, and calls them in turn. For example, tasks such as looking up a list of devices in the AAS registry, extracting device information, and checking network connectivity use dedicated tools for that purpose. Check the results of each step before proceeding to the next, and if an error occurs, detect it and notify the user. Also, clearly communicate the step-by-step progress to the user. For tasks with multiple steps, share progress by indicating what you're currently doing for each step, such as “Step 1: ...”, “Step 2: ...”, etc. For example:
+SYSTEM_PROMPT = """You are an expert AI assistant who leverages digital twins (Asset Administration Shell, AAS) and industrial agents to control manufacturing processes. You are well-versed in digital representations of factory equipment and processes, and have a good understanding of industrial protocols such as OPC UA and the concept of equipment health (availability). When it receives a request from a user to control a manufacturing process, it analyzes the problem in a logical step-by-step manner and solves it by utilizing the appropriate tools in sequence. At each step, it clearly identifies what needs to be done, chooses the appropriate tool from the ones provided, and calls them in turn. For example, tasks such as looking up a list of devices in the AAS registry, extracting device information, and checking network connectivity use dedicated tools for that purpose. Check the results of each step before proceeding to the next, and if an error occurs, detect it and notify the user. When several tool calls do not depend on each other (for example looking up the submodels of several processes and checking equipment availability), issue them together in one run_tools_in_parallel call instead of one by one. Also, clearly communicate the step-by-step progress to the user. For tasks with multiple steps, share progress by indicating what you're currently doing for each step, such as “Step 1: ...”, “Step 2: ...”, etc. For example:
 "Step 1: Retrieving the list of devices from the AAS server..."
 "Step 2: Checking the IP information of the retrieved devices..."
 Describe the intermediate steps and, if necessary, add a summary of the results. These instructions make it easy for the **user (engineer)** to keep track of what steps the agent is taking. Keep the tone and format of your responses in mind for the field engineer and make sure they are concise but contain enough information to get the job done. Use jargon (AAS, OPC UA, ping, connection status, etc.) as appropriate, but get to the point. Avoid unnecessary verbosity, but give the user exactly the information they want, and emphasize important results (e.g., a list of currently connectable equipment or what the error says if an error occurs)."""
 
-logger.info("Initializing Ollama LLM with model: gemma3:27b")
-# Initialize the Ollama model.
-llm = Ollama(
-    model="gemma3:27b",
-    system=SYSTEM_PROMPT
-)
+# Streamlit re-runs this script on every message. The LLM, the MCP tool list and the
+# agent are built once per process and shared by all sessions.
+@st.cache_resource(show_spinner="Loading LLM...")
+def get_llm():
+    logger.info("Initializing Ollama LLM with model: gemma3:27b")
+    # Initialize the Ollama model.
+    return Ollama(
+        model="gemma3:27b",
+        system=SYSTEM_PROMPT
+    )
 
 
-tools = tf2.get_tools()
-logger.info(f"Tools loaded: {[tool.name for tool in tools]}")
-agent = initialize_agent(
-    tools=tools,
-    llm=llm,
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=True
-)
-logger.info("LangChain agent initialized Complete")
+@st.cache_resource(show_spinner="Discovering MCP tools...")
+def get_agent_tools():
+    tools = tf2.get_tools()
+    logger.info(f"Tools loaded: {[tool.name for tool in tools]}")
+    return tools
+
+
+@st.cache_resource(show_spinner="Initializing agent...")
+def get_agent():
+    agent = initialize_agent(
+        tools=get_agent_tools(),
+        llm=get_llm(),
+        # MCP tools take structured (multi-field) arguments built from their JSON schemas.
+        agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
+        verbose=True
+    )
+    logger.info("LangChain agent initialized Complete")
+    return agent
+
+
+# Fast-path commands that write to the PLC wait in session state until the user confirms them.
+def confirm_pending_plan():
+    plan = st.session_state.pop("pending_plan", None)
+    if plan is not None:
+        st.session_state.chat_history.append({"role": "assistant", "text": fast_path.execute_plan(plan)})
+
+
+def cancel_pending_plan():
+    plan = st.session_state.pop("pending_plan", None)
+    if plan is not None:
+        st.session_state.chat_history.append({"role": "assistant", "text": fast_path.cancel_plan(plan)})
+
+
+with st.sidebar:
+    if st.button("Reload MCP tools"):
+        get_agent_tools.clear()
+        get_agent.clear()
+    use_fast_path = st.toggle("Fast path for known commands", value=True)
+    st.caption("Fast path metrics")
+    st.json(fast_path.metrics.stats())
+
+agent = get_agent()
 # Render chat UI (display past messages)
 for chat in st.session_state.chat_history:
     with st.chat_message(chat["role"]):
@@ -66,6 +105,8 @@ user_input = st.chat_input("Input Message")
 
 if user_input:
     logger.info(f"User input received: {user_input}")
+    # A new message replaces a command that was never confirmed.
+    cancel_pending_plan()
     # Display and store user message
     st.session_state.chat_history.append({"role": "user", "text": user_input})
     with st.chat_message("user"):
@@ -73,8 +114,27 @@ if user_input:
 
     # Agent response.
     with st.chat_message("assistant"):
-        st_callback = StreamlitCallbackHandler(st.container())
-        with st.spinner("Thinking.."):
-            response = agent.run(user_input, callbacks=[st_callback])
-        st.markdown(response)
+        # Known command templates run their tool chain directly; everything else goes to the agent.
+        plan = fast_path.match_fast_path(user_input) if use_fast_path else None
+        if plan is None:
+            # Tokens and tool start/end events are rendered while the chain runs.
+            stream_handler = StreamingChatHandler(st.container())
+            started = time.perf_counter()
+            response = agent.run(user_input, callbacks=[stream_handler])
+            fast_path.metrics.record_agent(time.perf_counter() - started)
+            st.markdown(response)
+            if stream_handler.summary():
+                st.caption(stream_handler.summary())
+        elif plan.needs_confirmation:
+            st.session_state.pending_plan = plan
+            response = f"⚠️ {plan.describe()}\n\nConfirm to write to the PLC, or cancel."
+            st.markdown(response)
+        else:
+            response = fast_path.execute_plan(plan)
+            st.markdown(response)
         st.session_state.chat_history.append({"role": "assistant", "text": response})
+
+if "pending_plan" in st.session_state:
+    confirm_column, cancel_column = st.columns(2)
+    confirm_column.button("✅ Confirm", type="primary", on_click=confirm_pending_plan)
+    cancel_column.button("🚫 Cancel", on_click=cancel_pending_plan)
@@ -0,0 +1,421 @@
+"""
+LLM evaluation of generated FastMCP servers (moved out of research_code.ipynb).
+
+    python evaluation.py --groups AFPMMotorProductionType --evaluators gpt4 claude
+    python evaluation.py --batch        # Claude requests through the Message Batches API
+
+Every (generated file, evaluator) pair is scored concurrently, with bounded
+parallelism and the per-provider limits of generation.py. Scores are parsed
+from the evaluator's JSON answer and appended to results/scores.jsonl as
+they arrive. Evaluator responses go through llm_cache, so re-running an
+evaluation only calls the APIs for code files or prompt templates that changed.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from generation import PROVIDERS, PROVIDER_LIMITS, OUTPUT_DIR, RateLimiter, complete, require_key
+from llm_cache import llm_cache
+from static_checks import check_file
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PROMPT_DIR = "prompts_evaluate"
+RESULT_DIR = "results"
+CODE_MODELS = ["gpt4", "claude", "gemini", "gemma"]  # Generated model Name
+
+RESULT_STORE = f"{RESULT_DIR}/scores.jsonl"
+EVAL_CONCURRENCY = 8        # evaluator requests in flight across all providers
+BATCH_POLL_SECONDS = 15
+
+# Evaluation model Name -> provider and request parameters.
+EVALUATORS = {
+    "claude": {"provider": "anthropic", "model": "claude-sonnet-4-20250514", "max_tokens": 8196, "temperature": 0.2},
+    "gpt4": {"provider": "openai", "model": "o3-mini"},
+    "stub": {"provider": "stub_eval", "model": "stub", "delay": 0.2},
+}
+
+# Criterion -> max score, as defined in prompts_evaluate/*.txt
+CRITERIA = {
+    "structure": 15,
+    "tool_mapping": 15,
+    "executability": 10,
+    "pymodbus_usage": 10,
+    "error_handling": 10,
+    "docstring_quality": 10,
+    "naming_consistency": 10,
+    "code_quality": 10,
+    "bonus_features": 10,
+}
+
+
+# ───── generate Evaluation prompt ─────
+@lru_cache(maxsize=None)
+def load_template(process_group: str, prompt_dir=PROMPT_DIR) -> str:
+    prompt_path = Path(prompt_dir) / f"{process_group}.txt"
+    if not prompt_path.exists():
+        raise FileNotFoundError(f"Not find Prompt File: {prompt_path}")
+    with open(prompt_path, encoding="utf-8") as f:
+        return f.read()
+
+
+def build_eval_prompt(code_text: str, process_group: str, prompt_dir=PROMPT_DIR) -> str:
+    return load_template(process_group, prompt_dir).replace("{code}", code_text.strip())
+
+
+def call_stub_evaluator(prompt: str, spec: dict) -> str:
+    """Offline evaluator: half marks on every criterion."""
+    time.sleep(spec.get("delay", 0.0))
+    scores = {name: maximum // 2 for name, maximum in CRITERIA.items()}
+    scores["total_score"] = sum(scores.values())
+    return f"```json\n{json.dumps(scores, indent=2)}\n```"
+
+
+PROVIDERS["stub_eval"] = call_stub_evaluator
+PROVIDER_LIMITS.setdefault("stub_eval", (8, 0))
+
+
+def evaluate(eval_model: str, code_path: str, process_group: str, cache=llm_cache) -> str:
+    spec = EVALUATORS[eval_model]
+    code = Path(code_path).read_text(encoding="utf-8")
+    prompt = build_eval_prompt(code, process_group)
+    if cache is not None:
+        cached = cache.get(process_group, spec["provider"], spec, prompt)
+        if cached is not None:
+            return cached
+    text = PROVIDERS[spec["provider"]](prompt, spec)
+    if cache is not None:
+        cache.put(process_group, spec["provider"], spec, prompt, text)
+    return text
+
+
+#-----------Evaluate With Claude4 ---------------------------
+def evaluate_with_claude(code_path: str, process_group: str) -> str:
+    return evaluate("claude", code_path, process_group)
+
+
+#-----------Evaluate With O3 ---------------------------
+def evaluate_with_gpt_o3(code_path: str, process_group: str) -> str:
+    return evaluate("gpt4", code_path, process_group)
+
+
+# ───── Start Evaluate Function ─────
+def evaluate_all_for_process(process_group: str, code_dir=OUTPUT_DIR) -> dict:
+    eval_models = ["gpt4", "claude"]            # Evaluation model Name
+
+    results = {}
+
+    for code_model in CODE_MODELS:
+        filename = os.path.join(code_dir, f"generated_{code_model}_{process_group}.py")
+        print(f"\n=== evaluation Code: {filename} ===")
+
+        if not os.path.exists(filename):
+            print("⚠️ No Code File.")
+            results[code_model] = "No Code File"
+            continue
+
+        evaluations = {}
+
+        for eval_model in eval_models:
+            try:
+                evaluations[eval_model] = evaluate(eval_model, filename, process_group)
+            except Exception as e:
+                print(f"❌ {eval_model.upper()} evaluate Exception:", e)
+                evaluations[eval_model] = f"evaluate Exception: {e}"
+
+        # save evaluate Result
+        result_file = Path(f"{RESULT_DIR}/{process_group}_{code_model}_eval.txt")
+        result_file.parent.mkdir(exist_ok=True)
+
+        # 📄 add target Fila Name
+        header = f"📄 Evaluate target: {filename}\n"
+        content = "\n".join([
+            f"\n===== {eval.upper()} result =====\n{res.strip()}"
+            for eval, res in evaluations.items()
+        ])
+        result_file.write_text(header + content, encoding="utf-8")
+
+        results[code_model] = evaluations
+
+    return results
+
+
+# ───── Evaluation engine ─────
+EvalJob = namedtuple("EvalJob", ["process_group", "code_model", "evaluator", "path"])
+
+
+def find_jobs(process_groups, code_dir=OUTPUT_DIR, evaluators=("gpt4", "claude")) -> list:
+    """One job per generated file (generated_<model>_<process_group>*.py) and evaluator."""
+    jobs = []
+    for process_group in process_groups:
+        for path in sorted(Path(code_dir).glob(f"generated_*_{process_group}*.py")):
+            code_model = path.name[len("generated_"):].split(f"_{process_group}")[0]
+            jobs.extend(EvalJob(process_group, code_model, evaluator, str(path)) for evaluator in evaluators)
+    return jobs
+
+
+# A JSON string literal (kept) or a // comment outside of strings (removed).
+JSON_STRING_OR_COMMENT = re.compile(r'"(?:\\.|[^"\\])*"|//[^\n]*')
+
+
+def strip_json_comments(text: str) -> str:
+    return JSON_STRING_OR_COMMENT.sub(lambda m: m.group(0) if m.group(0).startswith('"') else "", text)
+
+
+def load_json_object(text: str) -> dict:
+    """The JSON object in text: as is, else fenced or between the outer braces, else without // comments."""
+    fenced = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", text, re.DOTALL)
+    candidate = fenced.group(1) if fenced else text[text.find("{"):text.rfind("}") + 1]
+    error = None
+    for attempt in (text.strip(), candidate, strip_json_comments(candidate)):
+        try:
+            data = json.loads(attempt)
+        except ValueError as e:
+            error = e
+            continue
+        if isinstance(data, dict):
+            return data
+    raise ValueError(f"no JSON object in evaluator response ({error})")
+
+
+def parse_scores(text: str) -> dict:
+    """Criterion scores from an evaluator answer (a JSON object, possibly fenced and with // comments)."""
+    data = load_json_object(text)
+
+    scores = {}
+    for name, maximum in CRITERIA.items():
+        value = data.get(name)
+        if isinstance(value, dict):  # {"score": n, "explanation": "..."}
+            value = value.get("score")
+        if isinstance(value, (int, float)):
+            scores[name] = max(0, min(int(value), maximum))
+    if not scores:
+        raise ValueError("evaluator response has no criterion scores")
+    return {"scores": scores, "total_score": sum(scores.values())}
+
+
+class ResultStore:
+    """Append-only JSONL file of evaluation records; the last record per (file, evaluator) wins."""
+
+    def __init__(self, path=RESULT_STORE):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def append(self, record: dict):
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def records(self) -> list:
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return []
+        return [json.loads(line) for line in lines if line.strip()]
+
+    def latest(self) -> dict:
+        return {(r["process_group"], r["file"], r["evaluator"]): r for r in self.records()}
+
+
+def run_anthropic_batch(requests: dict, poll_seconds=BATCH_POLL_SECONDS) -> dict:
+    """
+    Send {custom_id: (prompt, spec)} as one Message Batch and wait for it.
+
+    Returns {custom_id: response text or Exception}. Blocking; run in a thread.
+    """
+    import anthropic
+    client = anthropic.Anthropic(api_key=require_key("ANTHROPIC_API_KEY"))
+    batch = client.messages.batches.create(requests=[
+        {
+            "custom_id": custom_id,
+            "params": {
+                "model": spec["model"],
+                "max_tokens": spec["max_tokens"],
+                "temperature": spec["temperature"],
+                "messages": [{"role": "user", "content": prompt}],
+            },
+        }
+        for custom_id, (prompt, spec) in requests.items()
+    ])
+    logger.info(f"[evaluation] Submitted batch {batch.id} with {len(requests)} requests")
+    while batch.processing_status != "ended":
+        time.sleep(poll_seconds)
+        batch = client.messages.batches.retrieve(batch.id)
+
+    results = {}
+    for entry in client.messages.batches.results(batch.id):
+        if entry.result.type == "succeeded":
+            results[entry.custom_id] = entry.result.message.content[0].text
+        else:
+            results[entry.custom_id] = RuntimeError(f"batch request {entry.result.type}")
+    return results
+
+
+async def run_evaluation(process_groups, code_dir=OUTPUT_DIR, evaluators=("gpt4", "claude"),
+                         store_path=RESULT_STORE, concurrency=EVAL_CONCURRENCY, use_batch=False,
+                         cache=llm_cache, static=True) -> list:
+    """
+    Score every generated file of process_groups with every evaluator and return the records.
+
+    Each record is appended to the result store as soon as its score is known.
+    With static, every file is first checked by static_checks: files that
+    cannot run are scored from the static report alone, without any LLM call,
+    and for the others the static structure/tool_mapping/executability/
+    naming_consistency scores replace the evaluator's.
+    With use_batch, uncached Claude requests are sent as one Message Batch
+    (cheaper, results arrive together); other providers have no batch API
+    in the SDK versions used here and run as individual concurrent requests.
+    """
+    jobs = find_jobs(process_groups, code_dir, evaluators)
+    store = ResultStore(store_path)
+    semaphore = asyncio.Semaphore(concurrency)
+    limiters = {}
+    records = []
+    reports = {job.path: check_file(job.path, job.process_group) for job in jobs} if static else {}
+
+    def apply_static(record, report):
+        overridden = {name: value for name, value in report["scores"].items() if value is not None}
+        record["llm_scores"] = {name: record["scores"].get(name) for name in overridden}
+        record["scores"].update(overridden)
+        record["total_score"] = sum(record["scores"].values())
+        record["static"] = {"passed": report["passed"], "findings": report["findings"]}
+
+    def finish(job, started, text=None, error=None, cached=False):
+        record = {
+            "process_group": job.process_group,
+            "code_model": job.code_model,
+            "evaluator": job.evaluator,
+            "file": os.path.basename(job.path),
+            "model": EVALUATORS[job.evaluator]["model"],
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        report = reports.get(job.path)
+        if report is not None and not report["passed"]:
+            # Short-circuited: no evaluator call, criteria without a static score get 0.
+            record["scores"] = {name: report["scores"].get(name) or 0 for name in CRITERIA}
+            record["total_score"] = sum(record["scores"].values())
+            record["static"] = {"passed": False, "findings": report["findings"]}
+        elif error is None:
+            try:
+                record.update(parse_scores(text))
+                if report is not None:
+                    apply_static(record, report)
+            except ValueError as e:
+                error = f"unparseable response: {e}"
+        record["error"] = error
+        record["cached"] = cached
+        record["seconds"] = round(time.perf_counter() - started, 2)
+        store.append(record)
+        records.append(record)
+        if error:
+            logger.warning(f"[evaluation] ❌ {job.evaluator} on {record['file']}: {error}")
+        else:
+            logger.info(f"[evaluation] {job.evaluator} on {record['file']}: {record['total_score']}/100")
+
+    def prompt_for(job):
+        code = Path(job.path).read_text(encoding="utf-8")
+        return build_eval_prompt(code, job.process_group)
+
+    async def run_one(job):
+        spec = EVALUATORS[job.evaluator]
+        provider = spec["provider"]
+        if provider not in limiters:
+            limiters[provider] = RateLimiter(*PROVIDER_LIMITS.get(provider, (1, 0)))
+        started = time.perf_counter()
+        try:
+            async with semaphore:
+                text, attempts = await complete(provider, prompt_for(job), spec, limiters[provider],
+                                                cache, job.process_group)
+            finish(job, started, text, cached=attempts == 0)
+        except Exception as e:
+            finish(job, started, error=str(e))
+
+    async def run_batch(batch_jobs):
+        started = time.perf_counter()
+        requests = {}
+        for number, job in enumerate(batch_jobs):
+            spec = EVALUATORS[job.evaluator]
+            prompt = prompt_for(job)
+            cached = cache.get(job.process_group, spec["provider"], spec, prompt) if cache is not None else None
+            if cached is not None:
+                finish(job, started, cached, cached=True)
+            else:
+                requests[f"eval-{number}"] = (job, prompt, spec)
+        if not requests:
+            return
+        try:
+            results = await asyncio.to_thread(
+                run_anthropic_batch, {cid: (prompt, spec) for cid, (_, prompt, spec) in requests.items()})
+        except Exception as e:
+            results = {cid: e for cid in requests}
+        for cid, (job, prompt, spec) in requests.items():
+            result = results.get(cid, RuntimeError("missing from batch results"))
+            if isinstance(result, Exception):
+                finish(job, started, error=str(result))
+                continue
+            if cache is not None:
+                cache.put(job.process_group, spec["provider"], spec, prompt, result)
+            finish(job, started, result)
+
+    for job in jobs:
+        if job.path in reports and not reports[job.path]["passed"]:
+            finish(job, time.perf_counter())
+    jobs = [job for job in jobs if job.path not in reports or reports[job.path]["passed"]]
+
+    batch_jobs = [job for job in jobs if use_batch and EVALUATORS[job.evaluator]["provider"] == "anthropic"]
+    tasks = [run_one(job) for job in jobs if job not in batch_jobs]
+    if batch_jobs:
+        tasks.append(run_batch(batch_jobs))
+    await asyncio.gather(*tasks)
+    return records
+
+
+def summarize(records) -> dict:
+    """{process_group: {code_model: {evaluator: total_score}}}"""
+    summary = {}
+    for record in records:
+        if record.get("error") is None:
+            summary.setdefault(record["process_group"], {}).setdefault(record["code_model"], {})[
+                record["evaluator"]] = record["total_score"]
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score generated FastMCP servers with LLM evaluators")
+    parser.add_argument("--groups", nargs="+", default=None, help="process groups (default: every evaluation prompt)")
+    parser.add_argument("--code-dir", default=OUTPUT_DIR)
+    parser.add_argument("--evaluators", nargs="+", default=["gpt4", "claude"], choices=sorted(EVALUATORS))
+    parser.add_argument("--store", default=RESULT_STORE)
+    parser.add_argument("--concurrency", type=int, default=EVAL_CONCURRENCY)
+    parser.add_argument("--batch", action="store_true", help="send Claude requests through the Message Batches API")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--no-static", action="store_true", help="send every file to the evaluators, without static pre-checks")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    process_groups = args.groups or sorted(path.stem for path in Path(PROMPT_DIR).glob("*.txt"))
+    started = time.perf_counter()
+    records = asyncio.run(run_evaluation(
+        process_groups, args.code_dir, args.evaluators, args.store, args.concurrency, args.batch,
+        None if args.no_cache else llm_cache, not args.no_static,
+    ))
+    failed = sum(1 for record in records if record["error"])
+    print(f"✅ {len(records) - failed}/{len(records)} evaluations in {time.perf_counter() - started:.1f}s -> {args.store}")
+    print(json.dumps(summarize(records), indent=2))
+
+
+if __name__ == "__main__":
+    main()
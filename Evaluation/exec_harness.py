@@ -0,0 +1,302 @@
+"""
+Runs generated FastMCP servers for real and calls every tool they register.
+
+    python exec_harness.py GeneratedCode/*.py --concurrency 4
+
+One simulated PLC (AI_Agent/plc_simulator.py) is started on a free local
+port. Each generated file then runs in its own subprocess through a boot
+script that
+
+- points every ModbusTcpClient at the simulator, whatever host/port the code hardcodes
+- makes mcp.run(...) serve streamable-http on 127.0.0.1 and a free port
+
+The subprocess starts in a temporary working directory (also its HOME),
+with a minimal environment (PATH, PYTHONPATH, PYTHONUNBUFFERED, HOME; no
+API keys) and resource limits on POSIX: CPU time, address space and open
+files. This is not a sandbox. The generated code runs as the current user,
+with the same filesystem and network access as the harness. Only Modbus
+clients are redirected. Run untrusted files in a container or VM.
+
+The harness lists the tools with an MCP client, calls each one with
+arguments derived from its input schema, and records start-up errors,
+tool errors (raised, or returned as an error message) and per-tool latency
+in a JSON report.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SIMULATOR_SCRIPT = Path(__file__).resolve().parent.parent / "AI_Agent" / "plc_simulator.py"
+REPORT_PATH = "results/exec_report.json"
+HOST = "127.0.0.1"
+CONCURRENCY = 4             # servers running at the same time
+STARTUP_TIMEOUT = 20.0      # seconds until the server must accept connections
+TOOL_TIMEOUT = 30.0         # seconds per tool call
+CPU_LIMIT = 120             # CPU seconds per server process
+MEMORY_LIMIT = 2 * 1024 ** 3  # bytes of address space per server process
+OPEN_FILES_LIMIT = 256      # file descriptors per server process
+OUTPUT_TAIL_LINES = 20
+# Generated tools usually catch exceptions and return them as text/JSON instead of failing the call.
+REPORTED_ERROR = re.compile(r'^\W*(error|failed)\b|"status"\s*:\s*"(error|fail)|"error"\s*:\s*"', re.IGNORECASE)
+
+BOOT_SCRIPT = r'''
+import runpy, sys
+path, sim_host, sim_port, port = sys.argv[1], sys.argv[2], int(sys.argv[3]), int(sys.argv[4])
+
+try:
+    import pymodbus.client as modbus_client
+
+    def redirect(cls):
+        original = cls.__init__
+        def __init__(self, host=None, *args, **kwargs):
+            kwargs["port"] = sim_port
+            original(self, sim_host, *args, **kwargs)
+        cls.__init__ = __init__
+
+    redirect(modbus_client.ModbusTcpClient)
+    redirect(modbus_client.AsyncModbusTcpClient)
+except ImportError:
+    pass
+
+from fastmcp import FastMCP
+
+original_run = FastMCP.run
+def run(self, *args, **kwargs):
+    print("HARNESS_RUN_CALLED", flush=True)
+    kwargs.update(transport="streamable-http", host="127.0.0.1", port=port, show_banner=False)
+    return original_run(self, **kwargs)
+FastMCP.run = run
+
+namespace = runpy.run_path(path, run_name="__main__")
+# The file defined a server but never called mcp.run(...): serve the first instance.
+for value in list(namespace.values()):
+    if isinstance(value, FastMCP):
+        print("HARNESS_RUN_MISSING", flush=True)
+        original_run(value, transport="streamable-http", host="127.0.0.1", port=port, show_banner=False)
+        break
+else:
+    print("HARNESS_NO_SERVER", flush=True)
+'''
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+def _limit_resources():
+    """preexec_fn: resource limits of a server process (POSIX only; limits the platform lacks are skipped)."""
+    try:
+        import resource
+    except ImportError:
+        return
+    for name, limit in (("RLIMIT_CPU", CPU_LIMIT), ("RLIMIT_AS", MEMORY_LIMIT), ("RLIMIT_NOFILE", OPEN_FILES_LIMIT)):
+        try:
+            resource.setrlimit(getattr(resource, name), (limit, limit))
+        except (AttributeError, ValueError, OSError):
+            pass
+
+
+def _child_env(workdir: str) -> dict:
+    """Environment of a server process: nothing from the parent but the search paths, so no API keys."""
+    env = {"PATH": os.environ.get("PATH", os.defpath), "PYTHONUNBUFFERED": "1", "HOME": workdir}
+    if os.environ.get("PYTHONPATH"):
+        env["PYTHONPATH"] = os.environ["PYTHONPATH"]
+    if os.name == "nt":
+        env["SYSTEMROOT"] = os.environ.get("SYSTEMROOT", "")  # Python cannot start on Windows without it
+    return env
+
+
+def sample_value(schema: dict):
+    """A plausible value for a JSON schema property (default, first enum value or minimum first)."""
+    if "default" in schema:
+        return schema["default"]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    for option in schema.get("anyOf", []):
+        if option.get("type") != "null":
+            return sample_value(option)
+    json_type = schema.get("type", "string")
+    if isinstance(json_type, list):
+        json_type = next((t for t in json_type if t != "null"), "string")
+    if json_type == "integer":
+        return int(schema.get("minimum", 1))
+    if json_type == "number":
+        return float(schema.get("minimum", 1.0))
+    if json_type == "boolean":
+        return True
+    if json_type == "array":
+        return []
+    if json_type == "object":
+        return {}
+    return "test"
+
+
+def sample_arguments(input_schema: dict) -> dict:
+    properties = (input_schema or {}).get("properties", {})
+    return {name: sample_value(properties[name]) for name in (input_schema or {}).get("required", [])
+            if name in properties}
+
+
+async def _wait_for_port(port: int, process, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.returncode is not None:
+            return False
+        try:
+            _, writer = await asyncio.open_connection(HOST, port)
+            writer.close()
+            return True
+        except OSError:
+            await asyncio.sleep(0.2)
+    return False
+
+
+async def _stop(process):
+    if process.returncode is None:
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), 5)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+
+async def start_simulator(port: int, latency=0.0, fault_rate=0.0):
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, str(SIMULATOR_SCRIPT), "serve", "--host", HOST, "--port", str(port),
+        "--latency", str(latency), "--fault-rate", str(fault_rate),
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+    )
+    if not await _wait_for_port(port, process, STARTUP_TIMEOUT):
+        await _stop(process)
+        raise RuntimeError(f"PLC simulator did not start on port {port}")
+    return process
+
+
+async def run_file(path, simulator_port: int) -> dict:
+    """Start one generated server, call all of its tools and return its report entry."""
+    from fastmcp import Client
+
+    path = Path(path).resolve()
+    port = free_port()
+    entry = {"file": path.name, "started": False, "tools": []}
+    started = time.perf_counter()
+
+    with tempfile.TemporaryDirectory(prefix="exec_harness_") as workdir:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-c", BOOT_SCRIPT, str(path), HOST, str(simulator_port), str(port),
+            cwd=workdir, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+            env=_child_env(workdir), preexec_fn=_limit_resources if os.name == "posix" else None,
+        )
+        output = []
+
+        async def collect():
+            async for line in process.stdout:
+                output.append(line.decode("utf-8", errors="replace").rstrip())
+
+        collector = asyncio.create_task(collect())
+        try:
+            if not await _wait_for_port(port, process, STARTUP_TIMEOUT):
+                entry["error"] = "server exited during start-up" if process.returncode is not None \
+                    else f"server did not listen within {STARTUP_TIMEOUT:.0f}s"
+                return entry
+            entry["started"] = True
+            entry["startup_seconds"] = round(time.perf_counter() - started, 2)
+
+            async with Client(f"http://{HOST}:{port}/mcp") as client:
+                for tool in await client.list_tools():
+                    arguments = sample_arguments(getattr(tool, "input_schema", None) or tool.inputSchema)
+                    result = {"name": tool.name, "arguments": arguments}
+                    call_started = time.perf_counter()
+                    try:
+                        response = await client.call_tool_mcp(tool.name, arguments, timeout=TOOL_TIMEOUT)
+                        text = " ".join(getattr(item, "text", "") for item in response.content).strip()
+                        is_error = getattr(response, "is_error", None)
+                        if is_error is None:
+                            is_error = response.isError
+                        result["ok"] = not is_error and not REPORTED_ERROR.search(text)
+                        result["result" if result["ok"] else "error"] = text[:500]
+                    except Exception as e:
+                        result["ok"] = False
+                        result["error"] = f"{type(e).__name__}: {e}"[:500]
+                    result["seconds"] = round(time.perf_counter() - call_started, 3)
+                    entry["tools"].append(result)
+        except Exception as e:
+            entry["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            await _stop(process)
+            await asyncio.wait([collector], timeout=2)
+            entry["run_call"] = "missing" if "HARNESS_RUN_MISSING" in output else \
+                "ok" if "HARNESS_RUN_CALLED" in output else "none"
+            markers = {"HARNESS_RUN_CALLED", "HARNESS_RUN_MISSING", "HARNESS_NO_SERVER"}
+            entry["output_tail"] = [line for line in output if line not in markers][-OUTPUT_TAIL_LINES:]
+            ok = sum(1 for tool in entry["tools"] if tool["ok"])
+            entry["tools_ok"] = f"{ok}/{len(entry['tools'])}"
+            entry["seconds"] = round(time.perf_counter() - started, 2)
+            logger.info(f"[exec_harness] {entry['file']}: started={entry['started']} tools_ok={entry['tools_ok']}")
+    return entry
+
+
+async def run_harness(files, concurrency=CONCURRENCY, latency=0.0, fault_rate=0.0) -> dict:
+    simulator_port = free_port()
+    simulator = await start_simulator(simulator_port, latency, fault_rate)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(path):
+        async with semaphore:
+            return await run_file(path, simulator_port)
+
+    started = time.perf_counter()
+    try:
+        entries = await asyncio.gather(*(run_one(path) for path in files))
+    finally:
+        await _stop(simulator)
+
+    latencies = [tool["seconds"] for entry in entries for tool in entry["tools"] if tool["ok"]]
+    return {
+        "simulator": {"port": simulator_port, "latency": latency, "fault_rate": fault_rate},
+        "summary": {
+            "files": len(entries),
+            "started": sum(1 for entry in entries if entry["started"]),
+            "tools": sum(len(entry["tools"]) for entry in entries),
+            "tools_ok": sum(1 for entry in entries for tool in entry["tools"] if tool["ok"]),
+            "avg_tool_seconds": round(sum(latencies) / len(latencies), 3) if latencies else None,
+            "seconds": round(time.perf_counter() - started, 2),
+        },
+        "files": sorted(entries, key=lambda entry: entry["file"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run generated FastMCP servers against a simulated PLC")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated PLC response latency (s)")
+    parser.add_argument("--fault-rate", type=float, default=0.0, help="share of PLC requests answered with a fault")
+    parser.add_argument("--report", default=REPORT_PATH)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    report = asyncio.run(run_harness(args.files, args.concurrency, args.latency, args.fault_rate))
+    Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.report).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(json.dumps(report["summary"], indent=2))
+    for entry in report["files"]:
+        print(f"{'✅' if entry['started'] else '❌'} {entry['file']}: tools ok {entry['tools_ok']}"
+              + (f" ({entry['error']})" if entry.get("error") else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Concurrent FastMCP code generation for every (model, process group) pair.
+
+    python generation.py --models gpt4 claude gemini
+    python generation.py --models stub --groups AFPMMotorProductionType --stub-failure-rate 0.3
+
+Jobs run concurrently, limited per provider (parallel requests and requests
+per minute), and are retried with exponential backoff. Finished jobs are
+recorded in a progress manifest next to the generated files, so an
+interrupted run resumes where it stopped. Responses are stored in the
+content-addressed llm_cache, so unchanged requests are never paid twice
+(--no-cache asks the providers again).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from llm_cache import llm_cache
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PROMPT_DIR = "prompts_en"
+OUTPUT_DIR = "GeneratedCode"
+MANIFEST_NAME = "generation_progress.json"
+
+# Generated model name -> provider and request parameters.
+MODELS = {
+    "gpt4": {"provider": "openai", "model": "gpt-4o", "temperature": 0.3},
+    "claude": {"provider": "anthropic", "model": "claude-3-7-sonnet-20250219", "max_tokens": 4096, "temperature": 0.3},
+    "gemini": {"provider": "google", "model": "gemini-2.5-pro-preview-05-06"},
+    "stub": {"provider": "stub", "model": "stub", "delay": 0.2, "failure_rate": 0.0},
+}
+
+# provider -> (parallel requests, requests per minute)
+PROVIDER_LIMITS = {
+    "openai": (4, 60),
+    "anthropic": (4, 50),
+    "google": (2, 30),
+    "stub": (8, 0),
+}
+
+RETRIES = 4
+BACKOFF = 2.0                                       # seconds, doubled per attempt
+NON_RETRYABLE = (ValueError, FileNotFoundError, ImportError)  # missing API key / prompt file / SDK
+
+
+# ── Utilities (same output format as the notebook) ────────────────────────
+def clean_code_block(text: str) -> str:
+    code = re.sub(r"^```(?:python)?\n?", "", text.strip())
+    return re.sub(r"\n?```$", "", code)
+
+
+def save_code(code_text: str, model: str, process_group: str, output_dir=OUTPUT_DIR) -> str:
+    path = Path(output_dir) / f"generated_{model}_{process_group}.py"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(clean_code_block(code_text), encoding="utf-8")
+    return str(path)
+
+
+def require_key(name: str) -> str:
+    api_key = os.getenv(name)
+    if not api_key:
+        raise ValueError(f"❌ {name} not set in .env file or environment variables.")
+    return api_key
+
+
+# ── Providers: (prompt, spec) -> response text. Blocking; run in threads. ──
+def call_openai(prompt: str, spec: dict) -> str:
+    import openai
+    openai.api_key = require_key("OPENAI_API_KEY")
+    params = {"temperature": spec["temperature"]} if "temperature" in spec else {}  # o3 models take none
+    response = openai.ChatCompletion.create(
+        model=spec["model"],
+        messages=[{"role": "user", "content": prompt}],
+        **params
+    )
+    return response.choices[0].message.content
+
+
+def call_anthropic(prompt: str, spec: dict) -> str:
+    import anthropic
+    client = anthropic.Anthropic(api_key=require_key("ANTHROPIC_API_KEY"))
+    response = client.messages.create(
+        model=spec["model"],
+        max_tokens=spec["max_tokens"],
+        temperature=spec["temperature"],
+        messages=[{"role": "user", "content": prompt}]
+    )
+    return response.content[0].text
+
+
+def call_google(prompt: str, spec: dict) -> str:
+    import google.generativeai as genai
+    genai.configure(api_key=require_key("GOOGLE_API_KEY"))
+    response = genai.GenerativeModel(spec["model"]).generate_content(prompt)
+    return response.text
+
+
+STUB_TEMPLATE = '''```python
+# stub response for prompt {digest}
+from fastmcp import FastMCP
+
+mcp = FastMCP("Stub Server")
+
+
+@mcp.tool()
+def ping() -> str:
+    """Return a constant so the server has one callable tool."""
+    return "ok"
+
+
+if __name__ == "__main__":
+    mcp.run(transport="streamable-http", host="127.0.0.1", port=9000)
+```'''
+
+
+def call_stub(prompt: str, spec: dict) -> str:
+    """Offline provider: fixed latency, optional random failures, deterministic output per prompt."""
+    time.sleep(spec.get("delay", 0.0))
+    if random.random() < spec.get("failure_rate", 0.0):
+        raise RuntimeError("stub: simulated provider error")
+    return STUB_TEMPLATE.format(digest=hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12])
+
+
+PROVIDERS = {
+    "openai": call_openai,
+    "anthropic": call_anthropic,
+    "google": call_google,
+    "stub": call_stub,
+}
+
+
+# ── Scheduling ────────────────────────────
+class RateLimiter:
+    """At most max_concurrent requests in flight, started no faster than requests_per_minute."""
+
+    def __init__(self, max_concurrent: int, requests_per_minute: float = 0):
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        if self._interval:
+            async with self._lock:
+                now = time.monotonic()
+                wait = self._next_slot - now
+                self._next_slot = max(now, self._next_slot) + self._interval
+            if wait > 0:
+                await asyncio.sleep(wait)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+
+async def call_with_retries(provider: str, prompt: str, spec: dict, limiter: RateLimiter,
+                            retries=RETRIES, backoff=BACKOFF):
+    """Returns (response text, attempts)."""
+    call = PROVIDERS[provider]
+    for attempt in range(1, retries + 1):
+        try:
+            async with limiter:
+                return await asyncio.to_thread(call, prompt, spec), attempt
+        except NON_RETRYABLE:
+            raise
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            logger.warning(f"[generation] {provider} attempt {attempt} failed ({e}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+async def complete(provider: str, prompt: str, spec: dict, limiter: RateLimiter, cache=None, process_group=None):
+    """call_with_retries through the response cache. Returns (text, attempts); attempts is 0 on a cache hit."""
+    if cache is not None:
+        text = cache.get(process_group, provider, spec, prompt)
+        if text is not None:
+            return text, 0
+    text, attempts = await call_with_retries(provider, prompt, spec, limiter)
+    if cache is not None:
+        cache.put(process_group, provider, spec, prompt, text)
+    return text, attempts
+
+
+class ProgressManifest:
+    """JSON file of finished/failed jobs ("<model>/<process_group>" -> entry), rewritten after every job."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        try:
+            self.jobs = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.jobs = {}
+
+    def is_done(self, key: str) -> bool:
+        entry = self.jobs.get(key) or {}
+        return entry.get("status") == "done" and Path(entry.get("file", "")).exists()
+
+    def record(self, key: str, **entry):
+        self.jobs[key] = entry
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.jobs, indent=2, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+def find_process_groups(prompt_dir=PROMPT_DIR) -> list:
+    return sorted(path.stem for path in Path(prompt_dir).glob("*.txt"))
+
+
+async def generate_all(models, process_groups=None, prompt_dir=PROMPT_DIR, output_dir=OUTPUT_DIR,
+                       force=False, overrides=None, cache=llm_cache) -> dict:
+    """
+    Generate code for every model × process group and return the manifest entries of this run.
+
+    process_groups defaults to every prompt file in prompt_dir. Jobs already
+    recorded as done are skipped unless force is set. overrides (stub
+    delay/failure_rate) are merged into the spec of stub models only, so they
+    never change the request parameters or cache keys of real providers.
+    Pass cache=None to bypass the response cache.
+    """
+    process_groups = process_groups or find_process_groups(prompt_dir)
+    manifest = ProgressManifest(Path(output_dir) / MANIFEST_NAME)
+    limiters = {}
+    results = {}
+
+    async def run_job(model, process_group):
+        key = f"{model}/{process_group}"
+        if not force and manifest.is_done(key):
+            logger.info(f"[generation] {key} already done, skipping")
+            results[key] = dict(manifest.jobs[key], skipped=True)
+            return
+        spec = dict(MODELS[model])
+        if spec["provider"] == "stub":
+            spec.update(overrides or {})
+        provider = spec["provider"]
+        if provider not in limiters:
+            limiters[provider] = RateLimiter(*PROVIDER_LIMITS.get(provider, (1, 0)))
+
+        started = time.perf_counter()
+        try:
+            prompt = Path(prompt_dir, f"{process_group}.txt").read_text(encoding="utf-8")
+            text, attempts = await complete(provider, prompt, spec, limiters[provider], cache, process_group)
+            path = save_code(text, model, process_group, output_dir)
+            entry = {"status": "done", "file": path, "attempts": attempts, "cached": attempts == 0}
+            logger.info(f"[generation] ✅ {key} -> {path}")
+        except Exception as e:
+            entry = {"status": "failed", "error": str(e)}
+            logger.error(f"[generation] ❌ {key}: {e}")
+        entry["seconds"] = round(time.perf_counter() - started, 2)
+        manifest.record(key, **entry)
+        results[key] = entry
+
+    await asyncio.gather(*(run_job(model, pg) for pg in process_groups for model in models))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate FastMCP servers with several LLMs concurrently")
+    parser.add_argument("--models", nargs="+", default=["gpt4", "claude", "gemini"], choices=sorted(MODELS))
+    parser.add_argument("--groups", nargs="+", default=None, help="process groups (default: every prompt file)")
+    parser.add_argument("--prompt-dir", default=PROMPT_DIR)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--force", action="store_true", help="regenerate jobs that are already done")
+    parser.add_argument("--no-cache", action="store_true", help="ignore cached responses and do not store new ones")
+    parser.add_argument("--stub-delay", type=float, default=None)
+    parser.add_argument("--stub-failure-rate", type=float, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    overrides = {}
+    if args.stub_delay is not None:
+        overrides["delay"] = args.stub_delay
+    if args.stub_failure_rate is not None:
+        overrides["failure_rate"] = args.stub_failure_rate
+
+    started = time.perf_counter()
+    results = asyncio.run(generate_all(args.models, args.groups, args.prompt_dir, args.output_dir,
+                                       args.force, overrides, None if args.no_cache else llm_cache))
+    done = sum(1 for entry in results.values() if entry["status"] == "done")
+    cached = sum(1 for entry in results.values() if entry.get("cached"))
+    print(f"✅ {done}/{len(results)} jobs done ({cached} from cache) in {time.perf_counter() - started:.1f}s")
+    for key, entry in sorted(results.items()):
+        if entry["status"] != "done":
+            print(f"❌ {key}: {entry.get('error')}")
+
+
+if __name__ == "__main__":
+    main()
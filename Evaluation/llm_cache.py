@@ -0,0 +1,138 @@
+"""
+On-disk cache of raw LLM responses, keyed by the content of the request.
+
+    <cache_dir>/<process_group>/<sha256>.json
+
+The key is sha256(provider, model, parameters, prompt), so a call is only
+repeated when one of them changes (a new prompt file, model or temperature).
+Entries are grouped per process group for selective invalidation:
+
+    python llm_cache.py stats
+    python llm_cache.py invalidate --group AFPMMotorProductionType --model o3-mini
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+
+CACHE_DIR = ".llm_cache"
+
+
+def request_key(provider: str, model: str, params: dict, prompt: str) -> str:
+    payload = json.dumps(
+        {"provider": provider, "model": model, "params": params, "prompt": prompt},
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def spec_params(spec: dict) -> dict:
+    """Request parameters of a model spec (everything but provider and model)."""
+    return {key: value for key, value in spec.items() if key not in ("provider", "model")}
+
+
+class LLMCache:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self._lock = threading.Lock()
+        self._counters = {}  # process group -> {"hits": n, "misses": n}
+
+    def _path(self, process_group: str, key: str) -> Path:
+        return self.cache_dir / process_group / f"{key}.json"
+
+    def _count(self, process_group, field):
+        with self._lock:
+            counters = self._counters.setdefault(process_group, {"hits": 0, "misses": 0})
+            counters[field] += 1
+
+    def get(self, process_group: str, provider: str, spec: dict, prompt: str):
+        """Cached response text, or None."""
+        key = request_key(provider, spec["model"], spec_params(spec), prompt)
+        try:
+            entry = json.loads(self._path(process_group, key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._count(process_group, "misses")
+            return None
+        self._count(process_group, "hits")
+        return entry["response"]
+
+    def put(self, process_group: str, provider: str, spec: dict, prompt: str, response: str):
+        params = spec_params(spec)
+        key = request_key(provider, spec["model"], params, prompt)
+        path = self._path(process_group, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "provider": provider,
+            "model": spec["model"],
+            "params": params,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "response": response,
+        }
+        # Unique temp name: several threads may store the same key at once.
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(path)
+
+    def invalidate(self, process_group=None, provider=None, model=None) -> int:
+        """Delete matching entries (all of them without filters). Returns the number removed."""
+        removed = 0
+        groups = [self.cache_dir / process_group] if process_group else self.cache_dir.glob("*")
+        for group_dir in groups:
+            for path in group_dir.glob("*.json"):
+                if provider or model:
+                    try:
+                        entry = json.loads(path.read_text(encoding="utf-8"))
+                    except (OSError, ValueError):
+                        entry = {}
+                    if provider and entry.get("provider") != provider:
+                        continue
+                    if model and entry.get("model") != model:
+                        continue
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        """Hits/misses of this process and entries/bytes on disk, per process group."""
+        groups = {}
+        for group_dir in sorted(self.cache_dir.glob("*")):
+            files = list(group_dir.glob("*.json"))
+            groups[group_dir.name] = {"entries": len(files), "bytes": sum(f.stat().st_size for f in files)}
+        with self._lock:
+            for group, counters in self._counters.items():
+                groups.setdefault(group, {"entries": 0, "bytes": 0}).update(counters)
+            hits = sum(c["hits"] for c in self._counters.values())
+            misses = sum(c["misses"] for c in self._counters.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+            "groups": groups,
+        }
+
+
+llm_cache = LLMCache()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or invalidate the LLM response cache")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats")
+    invalidate = sub.add_parser("invalidate")
+    invalidate.add_argument("--group", default=None)
+    invalidate.add_argument("--provider", default=None)
+    invalidate.add_argument("--model", default=None)
+    args = parser.parse_args()
+
+    cache = LLMCache(args.cache_dir)
+    if args.command == "stats":
+        print(json.dumps(cache.stats()["groups"], indent=2))
+    else:
+        print(f"🗑️ Removed {cache.invalidate(args.group, args.provider, args.model)} cached responses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+AST-based pre-checks of generated FastMCP servers.
+
+Scores the deterministic criteria of prompts_evaluate/*.txt locally, in
+milliseconds, so LLM evaluators only need to judge the subjective ones:
+
+- structure (15):          FastMCP import and instance, @mcp.tool() registrations, mcp.run(...) under __main__
+- tool_mapping (15):       required idShorts implemented as tools
+- executability (10):      parses, imports resolve, pymodbus calls match the pymodbus 3.x signatures
+- naming_consistency (10): tool names are snake_case and match the idShorts
+
+Files that cannot run (syntax error, no FastMCP instance, unimportable
+modules) are reported as not passed and are not sent to LLM evaluators.
+Imports are resolved with importlib.util.find_spec in the interpreter running
+the checks (plus the file's own directory), by top-level package, without
+importing anything; imports guarded by `except ImportError` are optional.
+Submodules are only checked against REMOVED_MODULES.
+
+    python static_checks.py GeneratedCode/*.py
+"""
+import argparse
+import ast
+import difflib
+import importlib.util
+import json
+import re
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+
+PROMPT_DIR = "prompts_evaluate"
+
+FASTMCP_MODULES = {"fastmcp", "mcp.server.fastmcp"}
+RUN_TRANSPORTS = {"stdio", "sse", "http", "streamable-http"}
+# Modules that no longer exist in the package versions the servers run on.
+REMOVED_MODULES = {
+    "pymodbus.client.sync": "removed in pymodbus 3.x, use `from pymodbus.client import ModbusTcpClient`",
+    "pymodbus.client.asynchronous": "removed in pymodbus 3.x, use `from pymodbus.client import AsyncModbusTcpClient`",
+}
+
+# pymodbus 3.x client methods -> (positional parameters, keyword parameters)
+PYMODBUS_METHODS = {
+    "read_coils": (("address",), {"address", "count", "slave", "device_id", "no_response_expected"}),
+    "read_discrete_inputs": (("address",), {"address", "count", "slave", "device_id", "no_response_expected"}),
+    "read_holding_registers": (("address",), {"address", "count", "slave", "device_id", "no_response_expected"}),
+    "read_input_registers": (("address",), {"address", "count", "slave", "device_id", "no_response_expected"}),
+    "write_coil": (("address", "value"), {"address", "value", "slave", "device_id", "no_response_expected"}),
+    "write_register": (("address", "value"), {"address", "value", "slave", "device_id", "no_response_expected"}),
+    "write_coils": (("address", "values"), {"address", "values", "slave", "device_id", "no_response_expected"}),
+    "write_registers": (("address", "values"), {"address", "values", "slave", "device_id", "no_response_expected"}),
+}
+MODBUS_CLIENTS = {"ModbusTcpClient", "AsyncModbusTcpClient"}
+SNAKE_CASE = re.compile(r"^[a-z_][a-z0-9_]*$")
+IMPORT_ERROR_HANDLERS = {"ImportError", "ModuleNotFoundError", "Exception", "BaseException"}
+
+
+@lru_cache(maxsize=None)
+def module_available(name: str) -> bool:
+    """Whether a top-level module can be imported here (find_spec does not import it)."""
+    if name in sys.stdlib_module_names or name in sys.builtin_module_names:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _optional_imports(tree) -> set:
+    """ids of import nodes inside a try whose handlers catch ImportError (or everything)."""
+    optional = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Try):
+            continue
+        catches = set()
+        for handler in node.handlers:
+            if handler.type is None:
+                catches.add("BaseException")
+            for name in ast.walk(handler.type) if handler.type is not None else ():
+                if isinstance(name, ast.Name):
+                    catches.add(name.id)
+        if catches & IMPORT_ERROR_HANDLERS:
+            optional.update(id(n) for statement in node.body for n in ast.walk(statement))
+    return optional
+
+
+def load_required_idshorts(process_group: str, prompt_dir=PROMPT_DIR) -> list:
+    """idShorts listed under "Required idShorts" in the evaluation prompt of a process group."""
+    try:
+        text = (Path(prompt_dir) / f"{process_group}.txt").read_text(encoding="utf-8")
+    except OSError:
+        return []
+    match = re.search(r"Required idShorts.*?\n(.*?)\n-{3,}", text, re.DOTALL)
+    if not match:
+        return []
+    return re.findall(r"^\s*-\s*(\w+)\s*$", match.group(1), re.MULTILINE)
+
+
+def normalize(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def _decorator_target(decorator):
+    """`@mcp.tool()` / `@mcp.tool` -> ("mcp", "tool")"""
+    node = decorator.func if isinstance(decorator, ast.Call) else decorator
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+        return node.value.id, node.attr
+    return None, None
+
+
+def _is_main_guard(node) -> bool:
+    return (
+        isinstance(node, ast.If)
+        and isinstance(node.test, ast.Compare)
+        and isinstance(node.test.left, ast.Name)
+        and node.test.left.id == "__name__"
+        and any(isinstance(c, ast.Constant) and c.value == "__main__" for c in node.test.comparators)
+    )
+
+
+def match_tools(tools: list, required: list) -> dict:
+    """idShort -> (tool name, exact) for every required idShort with a matching tool."""
+    matches = {}
+    by_normalized = {normalize(tool): tool for tool in tools}
+    for idshort in required:
+        key = normalize(idshort)
+        if key in by_normalized:
+            matches[idshort] = (by_normalized[key], True)
+            continue
+        close = difflib.get_close_matches(key, list(by_normalized), n=1, cutoff=0.8)
+        if close:
+            matches[idshort] = (by_normalized[close[0]], False)
+    return matches
+
+
+def check_source(source: str, required: list, local_dir=None) -> dict:
+    """local_dir: directory of the file, whose modules count as importable."""
+    findings = []
+    scores = {"structure": 0, "tool_mapping": 0, "executability": 0, "naming_consistency": 0}
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        findings.append(f"syntax error at line {e.lineno}: {e.msg}")
+        return {"passed": False, "scores": scores, "findings": findings, "tools": [], "documented_tools": "0/0"}
+
+    # ── imports ───────────────────────────
+    fastmcp_imported = False
+    import_errors = []
+    optional = _optional_imports(tree)
+
+    def check_module(module, lineno, node):
+        if module in REMOVED_MODULES:
+            import_errors.append(f"line {lineno}: `{module}` {REMOVED_MODULES[module]}")
+            return
+        top = module.split(".")[0]
+        local = local_dir is not None and (
+            (Path(local_dir) / f"{top}.py").exists() or (Path(local_dir) / top / "__init__.py").exists())
+        if id(node) not in optional and not local and not module_available(top):
+            import_errors.append(f"line {lineno}: module `{top}` is not installed")
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            if node.module in FASTMCP_MODULES and any(alias.name == "FastMCP" for alias in node.names):
+                fastmcp_imported = True
+            check_module(node.module, node.lineno, node)
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                check_module(alias.name, node.lineno, node)
+    findings.extend(import_errors)
+
+    # ── FastMCP instance, tools, run ──────
+    instances = set()
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Call):
+            func = node.value.func
+            name = func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)
+            if name == "FastMCP":
+                instances.update(t.id for t in node.targets if isinstance(t, ast.Name))
+
+    tools, undocumented = [], []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            for decorator in node.decorator_list:
+                owner, attr = _decorator_target(decorator)
+                if owner in instances and attr == "tool":
+                    tools.append(node.name)
+                    if not ast.get_docstring(node):
+                        undocumented.append(node.name)
+
+    run_calls = []  # (under main guard, transport)
+    main_guards = [node for node in tree.body if _is_main_guard(node)]
+    guarded = {id(n) for guard in main_guards for n in ast.walk(guard)}
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr == "run" and isinstance(node.func.value, ast.Name)
+                and node.func.value.id in instances):
+            transport = next((kw.value.value for kw in node.keywords
+                              if kw.arg == "transport" and isinstance(kw.value, ast.Constant)), None)
+            if transport is None and node.args and isinstance(node.args[0], ast.Constant):
+                transport = node.args[0].value
+            run_calls.append((id(node) in guarded, transport))
+
+    structure = 0
+    structure += 3 if fastmcp_imported else 0
+    structure += 4 if instances else 0
+    structure += 4 if tools else 0
+    if run_calls:
+        under_main, transport = run_calls[0]
+        structure += 2 if under_main else 1
+        structure += 2 if transport is None or transport in RUN_TRANSPORTS else 0
+        if transport is not None and transport not in RUN_TRANSPORTS:
+            findings.append(f"unknown mcp.run transport {transport!r}")
+        if not under_main:
+            findings.append("mcp.run(...) is not under `if __name__ == \"__main__\"`")
+    else:
+        findings.append("no mcp.run(...) call")
+    if not fastmcp_imported:
+        findings.append("FastMCP is not imported")
+    if not instances:
+        findings.append("no FastMCP instance")
+    if not tools:
+        findings.append("no @mcp.tool() registrations")
+    scores["structure"] = structure
+
+    # ── tool mapping / naming ─────────────
+    matches = match_tools(tools, required)
+    missing = [idshort for idshort in required if idshort not in matches]
+    if missing:
+        findings.append(f"missing tools for idShorts: {', '.join(missing)}")
+    not_snake = [tool for tool in tools if not SNAKE_CASE.match(tool)]
+    if not_snake:
+        findings.append(f"tool names not snake_case: {', '.join(not_snake)}")
+    if undocumented:
+        findings.append(f"tools without docstring: {', '.join(undocumented)}")
+    if required:
+        scores["tool_mapping"] = round(15 * len(matches) / len(required))
+        naming = sum(1.0 if exact else 0.5 for _, exact in matches.values()) / len(required)
+        scores["naming_consistency"] = max(0, round(10 * naming) - len(not_snake))
+    else:
+        scores["tool_mapping"] = scores["naming_consistency"] = None  # nothing to compare against
+
+    # ── pymodbus calls ────────────────────
+    signature_errors = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+        if isinstance(func, ast.Attribute) and func.attr in PYMODBUS_METHODS:
+            positional, keywords = PYMODBUS_METHODS[func.attr]
+            if len(node.args) > len(positional):
+                signature_errors.append(
+                    f"line {node.lineno}: {func.attr}() takes {len(positional)} positional argument(s), "
+                    f"got {len(node.args)} (count/slave are keyword-only in pymodbus 3.x)")
+            unknown = [kw.arg for kw in node.keywords if kw.arg is not None and kw.arg not in keywords]
+            if unknown:
+                signature_errors.append(f"line {node.lineno}: {func.attr}() got unexpected keyword(s) {', '.join(unknown)}")
+        elif isinstance(func, ast.Name) and func.id in MODBUS_CLIENTS and len(node.args) > 1:
+            signature_errors.append(f"line {node.lineno}: {func.id}() takes the host only as positional argument")
+    findings.extend(signature_errors)
+
+    runnable = bool(instances) and not import_errors
+    if runnable:
+        executability = 10 - min(6, 2 * len(signature_errors)) - (0 if run_calls else 3)
+        scores["executability"] = max(0, executability)
+    return {
+        "passed": runnable,
+        "scores": scores,
+        "findings": findings,
+        "tools": tools,
+        "documented_tools": f"{len(tools) - len(undocumented)}/{len(tools)}",
+    }
+
+
+def check_file(path, process_group=None, prompt_dir=PROMPT_DIR) -> dict:
+    """Static report of one generated file; process_group defaults to the one in the file name."""
+    started = time.perf_counter()
+    path = Path(path)
+    if process_group is None:
+        process_group = next((p.stem for p in Path(prompt_dir).glob("*.txt") if p.stem in path.stem), None)
+    required = load_required_idshorts(process_group, prompt_dir) if process_group else []
+    report = check_source(path.read_text(encoding="utf-8"), required, local_dir=path.parent)
+    report["file"] = path.name
+    report["process_group"] = process_group
+    report["seconds"] = round(time.perf_counter() - started, 4)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Static pre-checks of generated FastMCP servers")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--group", default=None, help="process group (default: from the file name)")
+    parser.add_argument("--prompt-dir", default=PROMPT_DIR)
+    args = parser.parse_args()
+
+    reports = [check_file(path, args.group, args.prompt_dir) for path in args.files]
+    print(json.dumps(reports, indent=2, ensure_ascii=False))
+    sys.exit(0 if all(report["passed"] for report in reports) else 1)
+
+
+if __name__ == "__main__":
+    main()